@@ -3,6 +3,7 @@ import compas
 import compas_fea2_opensees
 import math
 import numpy
+import random
 
 
 def pytest_ignore_collect(path):
@@ -34,3 +35,36 @@ def add_math(doctest_namespace):
 @pytest.fixture(autouse=True)
 def add_np(doctest_namespace):
     doctest_namespace["np"] = numpy
+
+
+class _Member(object):
+    """Node, element, part or model of the stand-in models of the tests."""
+
+    def __init__(self, key, **kwargs):
+        self._key = key
+        self.__dict__.update(kwargs)
+
+    @property
+    def key(self):
+        return self._key
+
+
+@pytest.fixture
+def grid_model():
+    """Factory of stand-in models with a single part meshed by a grid of
+    `nx` x `ny` quadrilaterals, optionally with shuffled node keys."""
+
+    def factory(nx, ny, shuffle=False):
+        keys = list(range(1, (nx + 1) * (ny + 1) + 1))
+        if shuffle:
+            random.Random(0).shuffle(keys)
+        nodes = [_Member(keys[j * (nx + 1) + i], xyz=[float(i), float(j), 0.0]) for j in range(ny + 1) for i in range(nx + 1)]
+        elements = []
+        for j in range(ny):
+            for i in range(nx):
+                n = j * (nx + 1) + i
+                elements.append(_Member(len(elements) + 1, nodes=[nodes[n], nodes[n + 1], nodes[n + nx + 2], nodes[n + nx + 1]]))
+        part = _Member(1, nodes=nodes, elements=elements, sorted_elements=elements, ndf=3)
+        return _Member(1, parts=[part], connectors=[], _renumbered=False)
+
+    return factory
@@ -552,3 +552,7 @@ if not load_dotenv():
     init_fea2_opensees(exe)
 
 EXE = os.getenv("EXE")
+# Parallel interpreters and MPI launcher, set with `fea2 change-setting opensees <setting> <value>`
+EXE_SP = os.getenv("EXE_SP")
+EXE_MP = os.getenv("EXE_MP")
+MPIEXEC = os.getenv("MPIEXEC", "mpiexec")
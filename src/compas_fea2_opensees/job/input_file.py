@@ -1,3 +1,4 @@
+import os
 from datetime import datetime
 
 import compas_fea2
@@ -5,6 +6,11 @@ from compas_fea2.job import InputFile
 from compas_fea2.job import ParametersFile
 
 import compas_fea2_opensees
+from compas_fea2_opensees.utilities import WRITE_BUFFER_SIZE
+
+from .partitioner import graph_partition
+from .partitioner import interface_nodes
+from .partitioner import subdomains
 
 
 class OpenseesInputFile(InputFile):
@@ -42,8 +48,29 @@ class OpenseesInputFile(InputFile):
         str
             content of the input file
         """
+        return "".join(self.iter_jobdata())
+
+    def iter_jobdata(self, model_file=None, subdomain=None):
+        """Generate the content of the input file block by block.
+
+        Parameters
+        ----------
+        model_file : str, optional
+            Path to a file with the model block, which is sourced instead of
+            being written in the input file, by default ``None``.
+        subdomain : :class:`compas_fea2_opensees.job.partitioner.Subdomain`, optional
+            Generate the input file of the rank of a subdomain of a parallel
+            analysis, by default ``None``. Only the subdomain is built, and the
+            results are written in the ``rank{rank}`` folder.
+
+        Yields
+        ------
+        str
+            Consecutive chunks of the input file. Joining them gives the same
+            result of :meth:`jobdata`.
+        """
         now = datetime.now().strftime("%d/%m/%Y %H:%M:%S")
-        return f"""# ------------------------
+        yield f"""# ------------------------
 # {self.problem.model.name}
 # ------------------------
 #
@@ -56,14 +83,19 @@ class OpenseesInputFile(InputFile):
 # Generated by:
 #   compas_fea2 v{compas_fea2.__version__}
 #   compas_fea2_opensees v{compas_fea2_opensees.__version__}
-#
+#{self._generate_renumbering_section()}{self._generate_systems_section()}
 #------------------------------------------------------------------
 #------------------------------------------------------------------
 # MODEL
 #------------------------------------------------------------------
 #------------------------------------------------------------------
 #
-#{self.problem.model.jobdata()}
+#"""
+        if model_file:
+            yield '\nsource "{}"'.format(model_file.replace("\\", "/"))
+        else:
+            yield from self.problem.model.iter_jobdata(subdomain=subdomain)
+        yield """
 #
 #
 # -----------------------------------------------------------------
@@ -72,8 +104,121 @@ class OpenseesInputFile(InputFile):
 # -----------------------------------------------------------------
 # -----------------------------------------------------------------
 #
-#{self.problem.jobdata()}
-"""
+#"""
+        if subdomain is None:
+            yield from self.problem.iter_jobdata()
+        else:
+            yield f"""
+file mkdir rank{subdomain.rank}
+cd rank{subdomain.rank}
+#"""
+            self.problem._subdomain = subdomain
+            try:
+                yield from self.problem.iter_jobdata()
+            finally:
+                self.problem._subdomain = None
+        yield "\n"
+
+    def _generate_renumbering_section(self):
+        """Record the renumbering of the nodes, if any."""
+        renumbering = getattr(self.problem, "renumbering", None)
+        if renumbering is None:
+            return ""
+        return "\n# Nodes renumbered with reverse Cuthill-McKee: half-bandwidth {} -> {} nodes\n#".format(*renumbering.bandwidth)
+
+    def _generate_systems_section(self):
+        """Record the systems of equations selected automatically for the
+        steps with ``system="auto"``."""
+        data = []
+        for step in self.problem._steps_order:
+            choice = getattr(step, "system_choice", None)
+            if choice:
+                data.append(
+                    f"#   {step.name}: system {choice.system}, numberer {choice.numberer} "
+                    f"({choice.dofs} DOFs, half-bandwidth {choice.bandwidth} after RCM, {'symmetric' if choice.symmetric else 'unsymmetric'}, "
+                    f"estimated memory {choice.memory / 2**20:.1f} MB)"
+                )
+        return "\n# Systems of equations:\n" + "\n".join(data) + "\n#" if data else ""
+
+    def write_to_file(self, path=None):
+        """Stream the input file to a file in a specified location.
+
+        The data is written through a buffered file handle as soon as it is
+        generated, so the peak memory does not grow with the size of the model.
+        If the problem is analysed incrementally, the model block is written to
+        a separate file in the parent folder, only if the model changed, and
+        sourced by the input file. If the nodes of the problem are renumbered,
+        the new keys are used only while the file is written.
+
+        Parameters
+        ----------
+        path : str, optional
+            Path to the folder where the input file will be saved, by default
+            ``None``. If not provided, the Problem path attributed is used.
+
+        Returns
+        -------
+        str
+            Path to the input file.
+
+        """
+        path = path or self.problem.path
+        if not path:
+            raise ValueError("A path to the folder for the input file must be provided")
+        file_path = os.path.join(path, self._file_name)
+        self.problem._renumber_nodes()
+        with self.problem._renumbered_nodes():
+            if getattr(self.problem, "parallel", None) == "mp":
+                return self._write_partitioned(file_path)
+            model_file = None
+            if getattr(self.problem, "incremental", False):
+                # the model block is shared by the problems in the same folder
+                model_file = self.problem.model.write_model_file(os.path.dirname(os.path.abspath(path)))
+            with open(file_path, "w", buffering=WRITE_BUFFER_SIZE) as f:
+                for chunk in self.iter_jobdata(model_file=model_file):
+                    f.write(chunk)
+        if compas_fea2.VERBOSE:
+            print("Input file generated in: {}".format(file_path))
+        return file_path
+
+    def _write_partitioned(self, file_path):
+        """Write the input file of each rank of an OpenSeesMP analysis, with
+        its subdomain, and the main input file sourcing it.
+
+        Parameters
+        ----------
+        file_path : str
+            Path to the main input file.
+
+        Returns
+        -------
+        str
+            Path to the main input file.
+        """
+        model = self.problem.model
+        processes = self.problem.processes
+        self.problem.subdomains = subdomains(model, graph_partition(model, processes), processes)
+        root, extension = os.path.splitext(file_path)
+        for subdomain in self.problem.subdomains:
+            with open(f"{root}.{subdomain.rank}{extension}", "w", buffering=WRITE_BUFFER_SIZE) as f:
+                for chunk in self.iter_jobdata(subdomain=subdomain):
+                    f.write(chunk)
+        with open(file_path, "w") as f:
+            f.write(f"""# ------------------------
+# {model.name}
+# ------------------------
+#
+# OpenSeesMP analysis on {processes} processes: each rank builds and
+# analyses its own subdomain.
+#
+# Elements per rank: {" ".join(str(len(domain.elements)) for domain in self.problem.subdomains)}
+# Interface nodes: {len(interface_nodes(self.problem.subdomains))}
+#
+source "{os.path.basename(root)}.[getPID]{extension}"
+""")
+        if compas_fea2.VERBOSE:
+            print("Input files generated in: {}".format(os.path.dirname(file_path)))
+        return file_path
 
 
 class OpenseesParametersFile(ParametersFile):
@@ -0,0 +1,220 @@
+"""Partitioning of the models in subdomains for the parallel analyses with
+OpenSeesMP, where each rank builds only its own subdomain.
+
+The elements are split by recursive spectral bisection of the graph of the
+elements sharing a node: each set of elements is ordered along the Fiedler
+vector of the Laplacian of its graph and cut where the two halves have the
+number of elements of their ranks. Cutting along the Fiedler vector keeps
+the connected elements together, which minimises the nodes on the interface
+between the subdomains.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse import diags
+from scipy.sparse.csgraph import connected_components
+from scipy.sparse.linalg import ArpackNoConvergence
+from scipy.sparse.linalg import eigsh
+
+# Graphs with fewer vertices are bisected with a dense eigensolver
+DENSE_SIZE = 200
+# Relative tolerance of the Fiedler vectors, which only need to order the
+# vertices
+FIEDLER_TOL = 1e-3
+
+Subdomain = namedtuple("Subdomain", ["rank", "nodes", "elements", "connectors", "owned_nodes"])
+Subdomain.__doc__ = """Part of a model built by a rank of a parallel analysis.
+
+Attributes
+----------
+rank : int
+    The rank building the subdomain.
+nodes : set
+    The nodes of the subdomain: the nodes of its elements and connectors. The
+    nodes on the interface with other subdomains are in all of them.
+elements : set
+    The elements of the subdomain.
+connectors : set
+    The connectors of the subdomain.
+owned_nodes : set
+    The nodes of the subdomain whose loads are applied by this rank: each node
+    is owned by the lowest rank where it is defined.
+"""
+
+
+def element_graph(model):
+    """Graph of the elements of a model: two elements are adjacent if they
+    share a node.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2_opensees.model.OpenseesModel`
+        The model.
+
+    Returns
+    -------
+    tuple
+        The elements, in the order of their keys, and the sparse adjacency
+        matrix of their graph, weighted by the number of shared nodes.
+    """
+    elements = [element for part in sorted(model.parts, key=lambda x: x.key) for element in part.sorted_elements]
+    node_index = {}
+    rows, columns = [], []
+    for row, element in enumerate(elements):
+        for node in element.nodes:
+            rows.append(row)
+            columns.append(node_index.setdefault(node, len(node_index)))
+    incidence = csr_matrix((np.ones(len(rows)), (rows, columns)), shape=(len(elements), len(node_index)))
+    adjacency = (incidence @ incidence.T).tocsr()
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return elements, adjacency
+
+
+def fiedler_vector(adjacency, coordinates=None):
+    """Fiedler vector of the normalised Laplacian of a connected graph.
+
+    Parameters
+    ----------
+    adjacency : :class:`scipy.sparse.csr_matrix`
+        Adjacency matrix of the graph.
+    coordinates : numpy.ndarray, optional
+        Coordinates of the vertices, used instead if the eigensolver does not
+        converge: the vertices are then ordered along the largest extent of
+        their bounding box.
+
+    Returns
+    -------
+    numpy.ndarray
+    """
+    n = adjacency.shape[0]
+    degrees = np.asarray(adjacency.sum(axis=1)).ravel()
+    scale = diags(1 / np.sqrt(np.maximum(degrees, 1e-300)))
+    # the largest eigenvalues of the normalised adjacency are the smallest of
+    # the normalised Laplacian, and converge faster
+    normalised = scale @ adjacency @ scale
+    if n <= DENSE_SIZE:
+        vectors = np.linalg.eigh(normalised.toarray())[1]
+        return scale @ vectors[:, -2]
+    try:
+        vectors = eigsh(normalised, k=2, which="LA", tol=FIEDLER_TOL, v0=np.sqrt(degrees))[1]
+    except ArpackNoConvergence:
+        if coordinates is None:
+            raise
+        extents = coordinates.max(axis=0) - coordinates.min(axis=0)
+        return coordinates[:, np.argmax(extents)]
+    return scale @ vectors[:, 0]
+
+
+def _bisect(adjacency, vertices, ranks, first_rank, element_ranks, coordinates):
+    if ranks == 1 or len(vertices) <= 1:
+        element_ranks[vertices] = first_rank
+        return
+    left_ranks = ranks // 2
+    n_left = len(vertices) * left_ranks // ranks
+    graph = adjacency[vertices][:, vertices]
+    n_components, labels = connected_components(graph, directed=False)
+    if n_components > 1:
+        # the components are kept whole, except the one across the cut, which
+        # is ordered along its Fiedler vector
+        order = np.argsort(labels, kind="stable")
+        ends = np.cumsum(np.bincount(labels))
+        component = int(np.searchsorted(ends, n_left, side="right"))
+        start = ends[component - 1] if component else 0
+        if start < n_left:
+            members = order[start : ends[component]]
+            values = fiedler_vector(graph[members][:, members], coordinates[vertices[members]])
+            order[start : ends[component]] = members[np.argsort(values, kind="stable")]
+    else:
+        order = np.argsort(fiedler_vector(graph, coordinates[vertices]), kind="stable")
+    _bisect(adjacency, vertices[order[:n_left]], left_ranks, first_rank, element_ranks, coordinates)
+    _bisect(adjacency, vertices[order[n_left:]], ranks - left_ranks, first_rank + left_ranks, element_ranks, coordinates)
+
+
+def graph_partition(model, processes):
+    """Assign the elements of a model to the ranks by recursive spectral
+    bisection of the graph of the elements.
+
+    Each rank gets the same number of elements (within one), for any number
+    of ranks.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2_opensees.model.OpenseesModel`
+        The model.
+    processes : int
+        Number of ranks.
+
+    Returns
+    -------
+    dict
+        The rank of each element.
+    """
+    elements, adjacency = element_graph(model)
+    element_ranks = np.zeros(len(elements), dtype=int)
+    if elements:
+        coordinates = np.array([np.mean([node.xyz for node in element.nodes], axis=0) for element in elements])
+        _bisect(adjacency, np.arange(len(elements)), processes, 0, element_ranks, coordinates)
+    return dict(zip(elements, element_ranks.tolist()))
+
+
+def interface_nodes(domains):
+    """Nodes on the interface between subdomains.
+
+    Parameters
+    ----------
+    domains : list[:class:`Subdomain`]
+        The subdomains.
+
+    Returns
+    -------
+    set
+        The nodes in more than one subdomain.
+    """
+    seen = set()
+    interface = set()
+    for domain in domains:
+        interface.update(domain.nodes & seen)
+        seen.update(domain.nodes)
+    return interface
+
+
+def subdomains(model, element_ranks, processes):
+    """Build the subdomains of a model from the ranks of its elements.
+
+    Each connector is assigned to the rank of the first subdomain with its
+    first node, and the nodes without elements and connectors to rank 0.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2_opensees.model.OpenseesModel`
+        The model.
+    element_ranks : dict
+        The rank of each element, e.g. from :func:`graph_partition`.
+    processes : int
+        Number of ranks.
+
+    Returns
+    -------
+    list[:class:`Subdomain`]
+        The subdomain of each rank.
+    """
+    domains = [Subdomain(rank, set(), set(), set(), set()) for rank in range(processes)]
+    for element, rank in element_ranks.items():
+        domains[rank].elements.add(element)
+        domains[rank].nodes.update(element.nodes)
+    for connector in model.connectors:
+        rank = next((domain.rank for domain in domains if connector.nodes[0] in domain.nodes), 0)
+        domains[rank].connectors.add(connector)
+        domains[rank].nodes.update(connector.nodes)
+    owned = set()
+    for domain in domains:
+        domain.owned_nodes.update(domain.nodes - owned)
+        owned.update(domain.nodes)
+    for part in model.parts:
+        free_nodes = [node for node in part.nodes if node not in owned]
+        domains[0].nodes.update(free_nodes)
+        domains[0].owned_nodes.update(free_nodes)
+    return domains
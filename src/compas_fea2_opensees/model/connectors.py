@@ -75,13 +75,13 @@ class OpenseesZeroLengthContactConnector(ZeroLengthContactConnector):
             raise ValueError("{} is not a valid implementation.".format(self._implementation))
 
     def _Contact3D(self):
-        eleTag = self.key + len(sorted(self.model.elements, key=lambda x: x.key))
+        eleTag = self.key + self.model.connectors_tag_offset
         cNode = self.nodes[0].key
         rNode = self.nodes[1].key
         return f"element zeroLengthContact3D {eleTag} {cNode} {rNode} {self.Kn} {self.Kt} {self.mu} {self._c} {self.direction}"
 
     def _ASDimplex(self):
-        eleTag = self.key + len(sorted(self.model.elements, key=lambda x: x.key))
+        eleTag = self.key + self.model.connectors_tag_offset
         cNode = self.nodes[0].key
         rNode = self.nodes[1].key
         return f"element zeroLengthContactASDimplex {eleTag} {cNode} {rNode} {self.Kn} {self.Kt} {self.mu} -orient {' '.join([str(i) for i in self.direction])}"
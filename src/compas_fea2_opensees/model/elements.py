@@ -1,4 +1,6 @@
+from itertools import groupby
 
+import numpy as np
 from compas.geometry import Frame
 from compas_fea2.model import BeamElement
 from compas_fea2.model import LinkElement
@@ -9,11 +11,53 @@ from compas_fea2.model import TetrahedronElement
 from compas_fea2.model import TrussElement
 from compas_fea2.model import _Element3D
 
+from compas_fea2_opensees.utilities import format_rows
+
+
+def _batch_rows(elements, section_data=None):
+    """Collect the table of a batch of elements for :func:`format_rows`.
+
+    Parameters
+    ----------
+    elements : list[:class:`compas_fea2.model._Element`]
+        Elements with the same number of nodes.
+    section_data : callable, optional
+        Function returning the string with the data of a section written after
+        the connectivity. It is evaluated only once per section.
+
+    Returns
+    -------
+    :class:`numpy.ndarray`
+        One row per element with the element key, the node keys and,
+        optionally, the section data.
+    """
+    connectivity = np.array([[element.key] + [node.key for node in element.nodes] for element in elements], dtype=np.int64)
+    if not section_data:
+        return connectivity
+    sections = [element.section for element in elements]
+    unique = {id(section): section for section in sections}
+    cache = {key: section_data(section) for key, section in unique.items()}
+    rows = np.empty((len(elements), connectivity.shape[1] + 1), dtype=object)
+    rows[:, :-1] = connectivity
+    rows[:, -1] = [cache[id(section)] for section in sections]
+    return rows
+
+
+class _OpenseesElement(object):
+    """Methods shared by the OpenSees elements."""
+
+    def mark_dirty(self):
+        """Notify a change of the element (e.g. of its nodes or of its
+        properties) to the model, so that its model file is written again."""
+        part = getattr(self, "_registration", None)
+        if part is not None:
+            part.mark_dirty()
+
 
 # ==============================================================================
 # 0D elements
 # ==============================================================================
-class OpenseesMassElement(MassElement):
+class OpenseesMassElement(_OpenseesElement, MassElement):
     """"""
 
     __doc__ += MassElement.__doc__
@@ -23,7 +67,7 @@ class OpenseesMassElement(MassElement):
         raise NotImplementedError
 
 
-class OpenseesLinkElement(LinkElement):
+class OpenseesLinkElement(_OpenseesElement, LinkElement):
     """Check the documentation \n"""
 
     __doc__ += LinkElement.__doc__
@@ -44,30 +88,101 @@ class OpenseesLinkElement(LinkElement):
 # ==============================================================================
 # 1D elements
 # ==============================================================================
-class OpenseesBeamElement(BeamElement):
+class OpenseesBeamElement(_OpenseesElement, BeamElement):
     """OpenSees implementation of :class:`compas_fea2.model.BeamElement`.\n"""
 
     __doc__ += BeamElement.__doc__
+    __doc__ += """
+    Additional Parameters
+    ---------------------
+    transformation : str, optional
+        Type of geometric transformation from the local to the global reference
+        system. It can be either "Linear", "PDelta" or "Corotational", by
+        default "Corotational".
 
-    def __init__(self, nodes, section, implementation="elasticBeamColumn", frame=[0.0, 0.0, -1.0], **kwargs):
+    Notes
+    -----
+    When the element is written by its part, beams sharing the same type of
+    transformation and orientation refer to a single ``geomTransf`` definition.
+
+    """
+
+    def __init__(self, nodes, section, implementation="elasticBeamColumn", frame=[0.0, 0.0, -1.0], transformation="Corotational", **kwargs):
         if not implementation:
             implementation = "elasticBeamColumn"
         super(OpenseesBeamElement, self).__init__(nodes=nodes, section=section, frame=frame, implementation=implementation, **kwargs)
+        self._transformation = transformation
+        self._transf_tag = None
 
         try:
             self._job_data = getattr(self, "_" + implementation)
         except AttributeError:
             raise ValueError("{} is not a valid implementation model".format(implementation))
 
+    @property
+    def transformation(self):
+        """str : The type of geometric transformation of the element."""
+        return self._transformation
+
+    @property
+    def transformation_key(self):
+        """The type of geometric transformation and the vector defining the
+        orientation of the local x-z plane, as written in the input file.
+        Beams with the same key share the same ``geomTransf``."""
+        return self._transformation, " ".join([str(i) for i in self.frame.zaxis])
+
+    @property
+    def transf_tag(self):
+        """Tag of the geometric transformation of the element. If the element
+        does not share a transformation, the element key is used."""
+        return self._transf_tag or self.key
+
     def jobdata(self):
+        if self._transf_tag:
+            return self._job_data()
         return "\n".join(
             [
-                # f"geomTransf Linear {self.key}",
-                "geomTransf Corotational {} {}".format(self.key, " ".join([str(i) for i in self.frame.zaxis])),
+                "geomTransf {} {} {}".format(self._transformation, self.key, self.transformation_key[1]),
                 self._job_data(),
             ]
         )
 
+    @classmethod
+    def batch_jobdata(cls, elements):
+        """Generate the commands of many beam elements in one vectorised pass.
+
+        Only the ``elasticBeamColumn`` implementation is batched, the others
+        fall back to :meth:`jobdata`.
+
+        Parameters
+        ----------
+        elements : list[:class:`OpenseesBeamElement`]
+            The elements, in the order in which they are written.
+
+        Returns
+        -------
+        str
+        """
+        blocks = []
+        for (implementation, shared), run in groupby(elements, key=lambda x: (x._implementation, bool(x._transf_tag))):
+            run = list(run)
+            if implementation != "elasticBeamColumn":
+                blocks.append("\n".join(element.jobdata() for element in run))
+                continue
+            if run[0].part.ndm == 2:
+                rows = _batch_rows(run, lambda x: "{} {} {}".format(x.A, x.material.E, x.Ixx))
+                fmt = "element elasticBeamColumn %d %d %d %s %d"
+            else:
+                rows = _batch_rows(run, lambda x: "{} {} {} {} {} {}".format(x.A, x.material.E, x.material.G, x.J, x.Ixx, x.Iyy))
+                fmt = "element {} %d %d %d %s %d".format(implementation)
+            rows = np.column_stack((rows, [element.transf_tag for element in run]))
+            if not shared:
+                transformations = np.array([(element._transformation, element.key, element.transformation_key[1]) for element in run], dtype=object)
+                rows = np.column_stack((transformations, rows))
+                fmt = "geomTransf %s %d %s\n" + fmt
+            blocks.append(format_rows(fmt, rows))
+        return "\n".join(blocks)
+
     def _elasticBeamColumn(self):
         """Construct an elasticBeamColumn element object.
 
@@ -81,7 +196,7 @@ class OpenseesBeamElement(BeamElement):
                 self.section.A,
                 self.section.material.E,
                 self.section.Ixx,
-                self.key,
+                self.transf_tag,
             )
         else:
             return "element {} {} {} {} {} {} {} {} {} {}".format(
@@ -94,7 +209,7 @@ class OpenseesBeamElement(BeamElement):
                 self.section.J,
                 self.section.Ixx,
                 self.section.Iyy,
-                self.key,
+                self.transf_tag,
             )
 
     def _inelasticBeamColum(self):
@@ -106,7 +221,7 @@ class OpenseesBeamElement(BeamElement):
         )
 
 
-class OpenseesTrussElement(TrussElement):
+class OpenseesTrussElement(_OpenseesElement, TrussElement):
     """A 1D element that resists axial loads."""
 
     __doc__ += TrussElement.__doc__
@@ -117,13 +232,29 @@ class OpenseesTrussElement(TrussElement):
     def jobdata(self):
         return f"element Truss {self.key} {self.nodes[0].key} {self.nodes[1].key} {self.section.A} {self.section.material.key}"
 
+    @classmethod
+    def batch_jobdata(cls, elements):
+        """Generate the commands of many truss elements in one vectorised pass.
+
+        Parameters
+        ----------
+        elements : list[:class:`OpenseesTrussElement`]
+            The elements, in the order in which they are written.
+
+        Returns
+        -------
+        str
+        """
+        rows = _batch_rows(elements, lambda x: f"{x.A} {x.material.key}")
+        return format_rows("element Truss %d %d %d %s", rows)
+
 
 # ==============================================================================
 # 2D elements
 # ==============================================================================
 
 
-class OpenseesShellElement(ShellElement):
+class OpenseesShellElement(_OpenseesElement, ShellElement):
     """OpenSees implementation of a :class:`ShellElemnt`."""
 
     __doc__ += ShellElement.__doc__
@@ -162,6 +293,58 @@ class OpenseesShellElement(ShellElement):
         except AttributeError:
             raise ValueError("{} is not a valid implementation.".format(self._implementation))
 
+    @classmethod
+    def batch_jobdata(cls, elements):
+        """Generate the commands of many shell elements in one vectorised pass.
+
+        The elements are split in consecutive runs with the same implementation
+        and each run is formatted at once. Implementations that cannot be
+        batched fall back to :meth:`jobdata`.
+
+        Parameters
+        ----------
+        elements : list[:class:`OpenseesShellElement`]
+            The elements, in the order in which they are written.
+
+        Returns
+        -------
+        str
+        """
+        blocks = []
+        for (implementation, mat_behaviour, n), run in groupby(elements, key=lambda x: (x._implementation.lower(), x._mat_behaviour, len(x.nodes))):
+            run = list(run)
+            nodes_fmt = " %d" * n
+            if implementation in cls._BATCH_COMMANDS:
+                cls._set_frames(run)
+                command, separator = cls._BATCH_COMMANDS[implementation]
+                fmt = "element " + command + " %d" + nodes_fmt + separator + "%d"
+                blocks.append(format_rows(fmt, _batch_rows(run, lambda x: x.key)))
+            elif implementation == "tri31":
+                rows = _batch_rows(run, lambda x: f"{x.t} {mat_behaviour} {x.material.key + 1000}")
+                blocks.append(format_rows("element tri31 %d" + nodes_fmt + " %s", rows))
+            elif implementation == "fournodequad":
+                cls._set_frames(run)
+                rows = _batch_rows(run, lambda x: f"{x.t} {mat_behaviour}")
+                blocks.append(format_rows("element quad %d" + nodes_fmt + " %s", rows))
+            else:
+                blocks.append("\n".join(element.jobdata() for element in run))
+        return "\n".join(blocks)
+
+    # implementations with the section tag right after the nodes
+    _BATCH_COMMANDS = {
+        "shelldkgt": ("ShellDKGT", " "),
+        "shelldkgq": ("ShellDKGQ", " "),
+        "shellmitc4": ("ShellMITC4", " "),
+        "asdshellq4": ("ASDShellQ4", "  "),
+    }
+
+    @staticmethod
+    def _set_frames(elements):
+        # NOTE: as in jobdata, the frame is recomputed since the nodes may have moved
+        for element in elements:
+            element._frame = Frame.from_points(element.nodes[0].xyz, element.nodes[1].xyz, element.nodes[2].xyz)
+            element._results_format = ("S11", "S22", "S12", "M11", "M22", "M12")
+
     def _tri31(self):
         """Construct a Tri31 element objec.
 
@@ -269,7 +452,7 @@ class OpenseesShellElement(ShellElement):
         )
 
 
-class OpenseesMembraneElement(MembraneElement):
+class OpenseesMembraneElement(_OpenseesElement, MembraneElement):
     """"""
 
     __doc__ += MembraneElement.__doc__
@@ -284,7 +467,7 @@ class OpenseesMembraneElement(MembraneElement):
 # ==============================================================================
 
 
-class _OpenseesElement3D(_Element3D):
+class _OpenseesElement3D(_OpenseesElement, _Element3D):
     """"""
 
     __doc__ += _Element3D.__doc__
@@ -357,7 +540,7 @@ class _OpenseesElement3D(_Element3D):
 
 
 # TODO double inheritance from _OpenseesElement3D
-class OpenseesTetrahedronElement(TetrahedronElement):
+class OpenseesTetrahedronElement(_OpenseesElement, TetrahedronElement):
     """Opensees implementation of :class:`TetrahedronElement`
 
     Note
@@ -398,6 +581,29 @@ class OpenseesTetrahedronElement(TetrahedronElement):
         except AttributeError:
             raise ValueError("{} is not a valid implementation.".format(self._implementation))
 
+    @classmethod
+    def batch_jobdata(cls, elements):
+        """Generate the commands of many tetrahedra in one vectorised pass.
+
+        Parameters
+        ----------
+        elements : list[:class:`OpenseesTetrahedronElement`]
+            The elements, in the order in which they are written.
+
+        Returns
+        -------
+        str
+        """
+        blocks = []
+        for implementation, run in groupby(elements, key=lambda x: x.implementation):
+            run = list(run)
+            if implementation == "FourNode":
+                rows = _batch_rows(run, lambda x: x.material.key + 1000)
+                blocks.append(format_rows("element FourNodeTetrahedron %d %d %d %d %d %d", rows))
+            else:
+                blocks.append("\n".join(element.jobdata() for element in run))
+        return "\n".join(blocks)
+
     def _FourNode(self):
         return f"element FourNodeTetrahedron {self.key} {' '.join(str(n.key) for n in self.nodes)} {self.section.material.key+1000}"
 
@@ -1,7 +1,13 @@
+import os
+
 from compas_fea2.model import Model
 from compas_fea2.model import SolidSection
 from compas_fea2.model import TrussSection
 
+from compas_fea2_opensees.utilities import WRITE_BUFFER_SIZE
+from compas_fea2_opensees.utilities import KeyOrderedIndex
+from compas_fea2_opensees.utilities import join_lines
+
 
 class OpenseesModel(Model):
     """OpenSees implementation of the :class::`Model`.
@@ -12,15 +18,120 @@ class OpenseesModel(Model):
     -------
     Work in Progress!
 
+    Notes
+    -----
+    When the problems are analysed incrementally, the model block of the input
+    file is written to a separate file only when the model changes. Adding or
+    removing parts, nodes, elements, materials, sections, boundary conditions
+    or connectors, and assigning another section to an element or another
+    material to a section, is detected automatically. Changes to the existing
+    members (e.g. moving a node or changing the nodes of an element) must be
+    notified with the ``mark_dirty`` method of the node, element, part or
+    model, and changes to the properties of the sections and materials with
+    :meth:`mark_dirty`.
+
     """
 
     __doc__ += Model.__doc__
 
     def __init__(self, description=None, author=None, **kwargs):
+        self._connectors_index = KeyOrderedIndex()
+        self._connectors_tag_offset = None
+        self._dirty = True
+        self._model_file = None
+        self._renumbered = False
         super(OpenseesModel, self).__init__(description=description, author=author, **kwargs)
 
+    @property
+    def sorted_connectors(self):
+        """list : The connectors of the model sorted by key."""
+        return self._connectors_index.ordered(self.connectors)
+
+    @property
+    def connectors_tag_offset(self):
+        """int : Offset added to the keys of the connectors implemented as
+        elements, so that their tags follow the ones of the elements."""
+        if self._connectors_tag_offset is None:
+            return len(self.elements)
+        return self._connectors_tag_offset
+
+    @property
+    def dirty(self):
+        """bool : ``True`` if the model changed since its model file was last written."""
+        return self._dirty or self._model_file is None or self._model_file[1] != self._signature()
+
+    def mark_dirty(self):
+        """Notify a change of the model, so that its model file is written again."""
+        self._dirty = True
+
+    def _signature(self):
+        parts = list(self.parts)
+        return (
+            len(parts),
+            sum(len(part.nodes) for part in parts),
+            sum(len(part.elements) for part in parts),
+            len(self.materials),
+            len(self.sections),
+            len(self.bcs),
+            len(self.connectors),
+            # the sections of the elements and the materials of the sections
+            hash(tuple(id(getattr(element, "section", None)) for part in parts for element in part.elements)),
+            hash(tuple(id(getattr(section, "material", None)) for section in self.sections)),
+        )
+
+    def add_connector(self, connector):
+        connector = super(OpenseesModel, self).add_connector(connector)
+        if connector is not None:
+            self._connectors_index.add(connector)
+            self.mark_dirty()
+        return connector
+
+    def write_model_file(self, path):
+        """Write the model block of the input file to ``{name}-model.tcl``,
+        unless the file is already up to date.
+
+        Parameters
+        ----------
+        path : str
+            Path to the folder of the model file.
+
+        Returns
+        -------
+        str
+            Path to the model file.
+        """
+        file_path = os.path.join(path, f"{self.name}-model.tcl")
+        if not self.dirty and self._model_file[0] == file_path and self._model_file[2] == self._renumbered and os.path.exists(file_path):
+            return file_path
+        with open(file_path, "w", buffering=WRITE_BUFFER_SIZE) as f:
+            for chunk in self.iter_jobdata():
+                f.write(chunk)
+            f.write("\n")
+        self._dirty = False
+        self._model_file = (file_path, self._signature(), self._renumbered)
+        return file_path
+
     def jobdata(self):
-        return """#
+        return "".join(self.iter_jobdata())
+
+    def iter_jobdata(self, subdomain=None):
+        """Generate the input file data of the model block by block.
+
+        The parts are serialised lazily, so that the data can be written to
+        the input file while the model is being walked.
+
+        Parameters
+        ----------
+        subdomain : :class:`compas_fea2_opensees.job.partitioner.Subdomain`, optional
+            Write only the nodes, elements, boundary conditions and connectors
+            of a subdomain, by default ``None``.
+
+        Yields
+        ------
+        str
+            Consecutive chunks of the model data.
+        """
+        yield """#
 # By default, models in compas_fea2 are defined in 3D.
 model Basic -ndm 3
 #
@@ -28,19 +139,31 @@ model Basic -ndm 3
 # Materials
 #==================================================================
 #
-{}
+"""
+        yield from join_lines(material.jobdata() for material in sorted(self.materials, key=lambda x: x.key))
+        yield """
 #
 #==================================================================
 # Sections
 #==================================================================
 #
-{}
+"""
+        yield from join_lines(
+            section.jobdata() for section in sorted(self.sections, key=lambda x: x.key) if not isinstance(section, (SolidSection, TrussSection))
+        )
+        yield """
 #
 #==================================================================
 # Parts
 #==================================================================
 #
-{}
+"""
+        geom_transformations = {}
+        for i, part in enumerate(sorted(self.parts, key=lambda x: x.key)):
+            if i:
+                yield "\n"
+            yield from part.iter_jobdata(geom_transformations=geom_transformations, subdomain=subdomain)
+        yield """
 #
 #
 #------------------------------------------------------------------
@@ -48,19 +171,28 @@ model Basic -ndm 3
 #------------------------------------------------------------------
 #
 #    tag   DX   DY   RZ   MX   MY   MZ
-{}
+"""
+        bcs = self.bcs.items()
+        if subdomain is not None:
+            bcs = [(bc, nodes) for bc, nodes in ((bc, [node for node in nodes if node in subdomain.nodes]) for bc, nodes in bcs) if nodes]
+        yield from join_lines(bc.jobdata(nodes) for bc, nodes in bcs)
+        yield """
 #
 #
 #------------------------------------------------------------------
 # Connectors
 #------------------------------------------------------------------
 #
-{}
+"""
+        # the number of elements is computed only once for all the connectors
+        self._connectors_tag_offset = sum(len(part.elements) for part in self.parts)
+        try:
+            connectors = self.sorted_connectors
+            if subdomain is not None:
+                connectors = [connector for connector in connectors if connector in subdomain.connectors]
+            yield from join_lines(connector.jobdata() for connector in connectors)
+        finally:
+            self._connectors_tag_offset = None
+        yield """
 #
-#""".format(
-            "\n".join([material.jobdata() for material in sorted(self.materials, key=lambda x: x.key)]),
-            "\n".join([section.jobdata() for section in sorted(self.sections, key=lambda x: x.key) if not isinstance(section, (SolidSection, TrussSection))]),
-            "\n".join([part.jobdata() for part in sorted(self.parts, key=lambda x: x.key)]),
-            "\n".join([bc.jobdata(nodes) for bc, nodes in self.bcs.items()]),
-            "\n".join([connector.jobdata() for connector in sorted(self.connectors, key=lambda x: x.key)]),
-        )
+#"""
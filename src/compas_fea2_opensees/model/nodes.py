@@ -1,6 +1,8 @@
-
+import numpy as np
 from compas_fea2.model import Node
 
+from compas_fea2_opensees.utilities import format_rows
+
 
 class OpenseesNode(Node):
     """Opensees implementation of the :class:`Node`. \n"""
@@ -10,6 +12,13 @@ class OpenseesNode(Node):
     def __init__(self, xyz, mass=None, **kwargs):
         super(OpenseesNode, self).__init__(xyz=xyz, mass=mass, **kwargs)
 
+    def mark_dirty(self):
+        """Notify a change of the node (e.g. of its coordinates or mass) to the
+        model, so that its model file is written again."""
+        part = getattr(self, "_registration", None)
+        if part is not None:
+            part.mark_dirty()
+
     def jobdata(self):
         # FIXME: the approximation on the floating point is not correct because it depends on the units
         x, y, z = self.xyz
@@ -19,3 +28,43 @@ class OpenseesNode(Node):
         else:
             mass = ""
         return coordinates + mass
+
+    @classmethod
+    def batch_jobdata(cls, nodes):
+        """Generate the ``node`` commands of many nodes in one vectorised pass.
+
+        The keys, coordinates and masses of the nodes are collected in NumPy
+        arrays and formatted together. The result is identical to joining the
+        :meth:`jobdata` of each node with new lines.
+
+        Parameters
+        ----------
+        nodes : list[:class:`OpenseesNode`]
+            The nodes, in the order in which they are written.
+
+        Returns
+        -------
+        str
+        """
+        if not nodes:
+            return ""
+        try:
+            masses = np.array([node.mass for node in nodes], dtype=float)
+        except ValueError:
+            # nodes with masses of different size: no bulk path
+            return "\n".join(node.jobdata() for node in nodes)
+        coordinates = np.array([(node.key, *node.xyz) for node in nodes], dtype=float)
+        has_mass = (masses != 0).any(axis=1) if masses.ndim == 2 else np.zeros(len(nodes), dtype=bool)
+
+        coordinates_fmt = "node %d %15.8f %15.8f %15.8f"
+        mass_fmt = coordinates_fmt + " -mass" + " %15.8f" * (masses.shape[1] if masses.ndim == 2 else 0)
+
+        # format the consecutive runs of nodes with and without mass
+        breaks = np.flatnonzero(np.diff(has_mass)) + 1
+        blocks = []
+        for start, end in zip(np.concatenate(([0], breaks)), np.concatenate((breaks, [len(nodes)]))):
+            if has_mass[start]:
+                blocks.append(format_rows(mass_fmt, np.column_stack((coordinates[start:end], masses[start:end]))))
+            else:
+                blocks.append(format_rows(coordinates_fmt, coordinates[start:end]))
+        return "\n".join(blocks)
@@ -1,6 +1,18 @@
 
+from itertools import chain
+from itertools import groupby
+
 from compas_fea2.model import Part
 
+from compas_fea2_opensees.utilities import KeyOrderedIndex
+from compas_fea2_opensees.utilities import join_lines
+
+from .elements import OpenseesBeamElement
+from .nodes import OpenseesNode
+
+# Number of nodes/elements serialised together in a single vectorised pass
+BATCH_SIZE = 100000
+
 
 class OpenseesPart(Part):
     """OpenSees implementation of :class:`compas_fea2.model.Part`.
@@ -24,6 +36,8 @@ class OpenseesPart(Part):
     """
 
     def __init__(self, ndm=None, ndf=None, **kwargs):
+        self._nodes_index = KeyOrderedIndex()
+        self._elements_index = KeyOrderedIndex()
         super(OpenseesPart, self).__init__(**kwargs)
         self._ndm = ndm or 3
         self._ndf = ndf or {1: 1, 2: 3, 3: 6}[self._ndm]
@@ -51,11 +65,65 @@ class OpenseesPart(Part):
             raise ValueError("The number of degree of freedom can be either 1,3 or 6.")
         self._ndf = value
 
+    @property
+    def sorted_nodes(self):
+        """list[:class:`OpenseesNode`] : The nodes of the part sorted by key."""
+        return self._nodes_index.ordered(self.nodes)
+
+    @property
+    def sorted_elements(self):
+        """list[:class:`compas_fea2.model._Element`] : The elements of the part sorted by key."""
+        return self._elements_index.ordered(self.elements)
+
+    def add_node(self, node):
+        node = super(OpenseesPart, self).add_node(node)
+        if node is not None:
+            self._nodes_index.add(node)
+            self.mark_dirty()
+        return node
+
+    def add_element(self, element):
+        element = super(OpenseesPart, self).add_element(element)
+        if element is not None:
+            self._elements_index.add(element)
+            self.mark_dirty()
+        return element
+
+    def mark_dirty(self):
+        """Notify a change of the part (or of its nodes and elements) to the model,
+        so that its model file is written again."""
+        model = getattr(self, "_registration", None)
+        if model is not None:
+            model.mark_dirty()
+
     # =========================================================================
     #                       Generate input file data
     # =========================================================================
     def jobdata(self):
-        return """#
+        return "".join(self.iter_jobdata())
+
+    def iter_jobdata(self, geom_transformations=None, subdomain=None):
+        """Generate the input file data of the part block by block.
+
+        Nodes and elements are serialised in vectorised batches, so that the
+        whole part never needs to be held in memory as a single string.
+
+        Parameters
+        ----------
+        geom_transformations : dict, optional
+            Geometric transformations already written in the input file and
+            their tags. It is updated with the new transformations of the part.
+            By default ``None``, which writes all the transformations used by
+            the part.
+        subdomain : :class:`compas_fea2_opensees.job.partitioner.Subdomain`, optional
+            Write only the nodes and elements of a subdomain, by default ``None``.
+
+        Yields
+        ------
+        str
+            Consecutive chunks of the part data.
+        """
+        yield """#
 #------------------------------------------------------------------
 # Part {}
 #------------------------------------------------------------------
@@ -65,17 +133,100 @@ model Basic -ndm {} -ndf {}
 #------------------------------------------------------------------
 #
 #    tag        X       Y       Z       mx      my      mz
-{}
+""".format(
+            self.name,
+            self._ndm,
+            self._ndf,
+        )
+        nodes = self.sorted_nodes
+        if subdomain is not None:
+            nodes = [node for node in nodes if node in subdomain.nodes]
+        yield from join_lines(
+            OpenseesNode.batch_jobdata(nodes[start : start + BATCH_SIZE]) for start in range(0, len(nodes), BATCH_SIZE)
+        )
+        yield """
 #
 # Elements
 #------------------------------------------------------------------
 #
-{}
+"""
+        elements = self.sorted_elements
+        if subdomain is not None:
+            elements = [element for element in elements if element in subdomain.elements]
+        if geom_transformations is None:
+            geom_transformations = {}
+        transformations = self._assign_geom_transformations(elements, geom_transformations)
+        try:
+            yield from join_lines(chain([transformations] if transformations else [], self._iter_elements_jobdata(elements)))
+        finally:
+            # the shared tags are only valid within this input file
+            for element in elements:
+                if isinstance(element, OpenseesBeamElement):
+                    element._transf_tag = None
+        yield """
 #
-#""".format(
-            self.name,
-            self._ndm,
-            self._ndf,
-            "\n".join([node.jobdata() for node in sorted(self.nodes, key=lambda x: x.key)]),
-            "\n".join([element.jobdata() for element in sorted(self.elements, key=lambda x: x.key)]),
-        )
+#"""
+
+    @staticmethod
+    def _assign_geom_transformations(elements, geom_transformations):
+        """Assign a shared geometric transformation to the beam elements.
+
+        Beams with the same type of transformation and orientation refer to the
+        same ``geomTransf``, which is written only once.
+
+        Parameters
+        ----------
+        elements : list[:class:`compas_fea2.model._Element`]
+            The elements of the part.
+        geom_transformations : dict
+            Transformations already written and their tags. It is updated with
+            the new transformations.
+
+        Returns
+        -------
+        str
+            The ``geomTransf`` commands of the new transformations.
+
+        Notes
+        -----
+        The tags are kept on the elements only while the part is written, so
+        that :meth:`OpenseesBeamElement.jobdata` called later on its own still
+        defines the transformation of the element.
+        """
+        data = []
+        for element in elements:
+            if not isinstance(element, OpenseesBeamElement):
+                continue
+            transformation = element.transformation_key
+            if transformation not in geom_transformations:
+                geom_transformations[transformation] = len(geom_transformations) + 1
+                data.append("geomTransf {} {} {}".format(transformation[0], geom_transformations[transformation], transformation[1]))
+            element._transf_tag = geom_transformations[transformation]
+        return "\n".join(data)
+
+    @staticmethod
+    def _iter_elements_jobdata(elements):
+        """Generate the data of the elements in batches of the same type.
+
+        Consecutive elements of the same class are formatted together through
+        the ``batch_jobdata`` of the class, when available.
+
+        Parameters
+        ----------
+        elements : list[:class:`compas_fea2.model._Element`]
+            The elements, in the order in which they are written.
+
+        Yields
+        ------
+        str
+            The data of each batch of elements.
+        """
+        for element_type, run in groupby(elements, key=type):
+            run = list(run)
+            batch_jobdata = getattr(element_type, "batch_jobdata", None)
+            for start in range(0, len(run), BATCH_SIZE):
+                batch = run[start : start + BATCH_SIZE]
+                if batch_jobdata:
+                    yield batch_jobdata(batch)
+                else:
+                    yield "\n".join(element.jobdata() for element in batch)
@@ -1,6 +1,10 @@
 
 # Opensees Problem
 from .problem import OpenseesProblem
+from ._batch import run_many
+from ._batch import JobReport
+from ._async import AnalysisEvent
+from ._cache import AnalysisCache
 
 # Opensees Steps
 from .steps import (
@@ -12,6 +16,7 @@ from .steps import (
     OpenseesDynamicStep,
     OpenseesQuasiStaticStep,
     OpenseesDirectCyclicStep,
+    IncrementReport,
 )
 
 # Opensees Loads
@@ -37,6 +42,10 @@ from ._combinations import (
 
 __all__ = [
     "OpenseesProblem",
+    "run_many",
+    "JobReport",
+    "AnalysisEvent",
+    "AnalysisCache",
     "OpenseesModalAnalysis",
     "OpenseesComplexEigenValue",
     "OpenseesStaticStep",
@@ -45,6 +54,7 @@ __all__ = [
     "OpenseesDynamicStep",
     "OpenseesQuasiStaticStep",
     "OpenseesDirectCyclicStep",
+    "IncrementReport",
     "OpenseesConcentratedLoad",
     "OpenseesPressureLoad",
     "OpenseesGravityLoad",
@@ -0,0 +1,156 @@
+"""Asynchronous execution of OpenSees problems with ``asyncio``."""
+
+import asyncio
+import os
+from collections import namedtuple
+
+import compas_fea2_opensees
+
+AnalysisEvent = namedtuple("AnalysisEvent", ["kind", "stream", "text"])
+AnalysisEvent.__doc__ = """Progress event of an asynchronous analysis.
+
+Attributes
+----------
+kind : str
+    ``"output"`` for a generic line printed by OpenSees, ``"warning"`` or
+    ``"error"`` for the warnings and errors reported by OpenSees, and
+    ``"completed"`` for the last event, issued when the process exits.
+stream : str
+    ``"stdout"`` or ``"stderr"``, ``None`` for the ``"completed"`` event.
+text : str
+    The line printed by OpenSees, or the exit code of the process for the
+    ``"completed"`` event.
+"""
+
+
+def parse_event(stream, line):
+    """Classify a line printed by OpenSees.
+
+    Parameters
+    ----------
+    stream : str
+        Name of the stream of the line, ``"stdout"`` or ``"stderr"``.
+    line : str
+        The line.
+
+    Returns
+    -------
+    :class:`AnalysisEvent`
+    """
+    line = line.strip()
+    if "error" in line.split(" "):
+        kind = "error"
+    elif line.upper().startswith("WARNING"):
+        kind = "warning"
+    else:
+        kind = "output"
+    return AnalysisEvent(kind, stream, line)
+
+
+async def _read_stream(stream, name, queue):
+    try:
+        async for line in stream:
+            await queue.put((name, line.decode(errors="replace")))
+    finally:
+        await queue.put(None)
+
+
+async def analysis_events(problem, path, exe=None, erase_data=False, timeout=None):
+    """Run the analysis of a problem in an OpenSees subprocess and stream its
+    output as progress events.
+
+    The OpenSees process is killed if the iteration is interrupted, e.g. when
+    the task consuming the events is cancelled or the timeout expires.
+
+    Parameters
+    ----------
+    problem : :class:`compas_fea2_opensees.problem.OpenseesProblem`
+        The problem to analyse.
+    path : str or pathlib.Path
+        Path to the analysis folder.
+    exe : str, optional
+        Location of the OpenSees executable, by default ``compas_fea2_opensees.EXE``.
+    erase_data : bool, optional
+        Erase the existing data in the analysis folder, by default ``False``.
+    timeout : float, optional
+        Maximum duration of the analysis in seconds, by default no limit.
+
+    Yields
+    ------
+    :class:`AnalysisEvent`
+        The events of the analysis, the last one being ``"completed"``.
+
+    Raises
+    ------
+    asyncio.TimeoutError
+        If the analysis lasts longer than `timeout`.
+    """
+    problem._prepare_analysis(path, erase_data=erase_data)
+    # writing the input file is blocking
+    await asyncio.to_thread(problem.write_input_file)
+    filepath = os.path.join(problem.path, problem.name + ".tcl")
+
+    exe = exe or compas_fea2_opensees.EXE
+    if not exe or not os.path.exists(exe):
+        raise ValueError(f"backend not found at {exe}")
+
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+    process = await asyncio.create_subprocess_exec(exe, filepath, cwd=problem.path, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    queue = asyncio.Queue()
+    readers = [
+        asyncio.ensure_future(_read_stream(process.stdout, "stdout", queue)),
+        asyncio.ensure_future(_read_stream(process.stderr, "stderr", queue)),
+    ]
+    try:
+        open_streams = len(readers)
+        while open_streams:
+            remaining = None if deadline is None else max(deadline - loop.time(), 0)
+            item = await asyncio.wait_for(queue.get(), remaining)
+            if item is None:
+                open_streams -= 1
+                continue
+            yield parse_event(*item)
+        remaining = None if deadline is None else max(deadline - loop.time(), 0)
+        returncode = await asyncio.wait_for(process.wait(), remaining)
+        yield AnalysisEvent("completed", None, str(returncode))
+    finally:
+        for reader in readers:
+            reader.cancel()
+        if process.returncode is None:
+            process.kill()
+            await process.wait()
+
+
+async def analyse_async(problem, path, exe=None, erase_data=False, timeout=None, on_event=None):
+    """Run the analysis of a problem in an OpenSees subprocess without
+    blocking the event loop.
+
+    Parameters
+    ----------
+    problem : :class:`compas_fea2_opensees.problem.OpenseesProblem`
+        The problem to analyse.
+    path : str or pathlib.Path
+        Path to the analysis folder.
+    exe : str, optional
+        Location of the OpenSees executable, by default ``compas_fea2_opensees.EXE``.
+    erase_data : bool, optional
+        Erase the existing data in the analysis folder, by default ``False``.
+    timeout : float, optional
+        Maximum duration of the analysis in seconds, by default no limit.
+    on_event : callable, optional
+        Function called with each :class:`AnalysisEvent` of the analysis.
+
+    Returns
+    -------
+    None
+    """
+    events = analysis_events(problem, path, exe=exe, erase_data=erase_data, timeout=timeout)
+    try:
+        async for event in events:
+            if on_event:
+                on_event(event)
+            if event.kind == "error":
+                raise Exception("ERROR! - Analysis failed to converge!\nSet VERBOSE=True to check the error.")
+    finally:
+        await events.aclose()
@@ -0,0 +1,118 @@
+"""Concurrent execution of many OpenSees problems."""
+
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import as_completed
+from contextlib import contextmanager
+
+JobReport = namedtuple("JobReport", ["problem", "status", "error", "time"])
+JobReport.__doc__ = """Outcome of the analysis of a problem run by :func:`run_many`.
+
+Attributes
+----------
+problem : :class:`compas_fea2_opensees.problem.OpenseesProblem`
+    The problem.
+status : str
+    Either ``"completed"`` or ``"failed"``.
+error : Exception
+    The exception raised by the analysis or the extraction of the results,
+    ``None`` if the job completed.
+time : float
+    Time spent writing the input file, running the analysis and extracting
+    the results, in seconds.
+"""
+
+
+def _run_job(problem, exe, verbose, reader):
+    start = time.perf_counter()
+    try:
+        problem._launch_solver(exe=exe, verbose=verbose)
+        if reader is not None:
+            with problem._reading_with(reader):
+                problem.extract_results()
+    except Exception as error:
+        return error, time.perf_counter() - start
+    return None, time.perf_counter() - start
+
+
+@contextmanager
+def _reader(extract, workers):
+    """Pool of processes parsing the files with the results, if any."""
+    if not extract:
+        yield None
+        return
+    with ProcessPoolExecutor(max_workers=workers) as reader:
+        yield reader
+
+
+def run_many(problems, path, workers=None, exe=None, erase_data=False, verbose=False, extract=True):
+    """Analyse many problems concurrently and extract their results.
+
+    The input files are written one after the other (the problems can share
+    the same model), then up to `workers` OpenSees processes are run at the
+    same time, each in the analysis folder of its problem. The results of each
+    problem are extracted as soon as its analysis is completed: the files
+    written by OpenSees are parsed in a pool of `workers` processes, while
+    the results are stored in the database of the problem by the thread of
+    its job. A failed job does not stop the others.
+
+    Parameters
+    ----------
+    problems : list[:class:`compas_fea2_opensees.problem.OpenseesProblem`]
+        The problems to analyse. Their names must be unique, since each of
+        them is analysed in a folder with its name.
+    path : str or pathlib.Path
+        Path to the folder containing the analysis folders of the problems.
+    workers : int, optional
+        Maximum number of concurrent jobs, by default the number of CPUs.
+    exe : str, optional
+        Location of the OpenSees executable, by default ``compas_fea2_opensees.EXE``.
+    erase_data : bool, optional
+        Erase the existing data in the analysis folders, by default ``False``.
+    verbose : bool, optional
+        Print the output from the solver and the status of each job as it
+        finishes, by default ``False``.
+    extract : bool, optional
+        Extract the results of each problem into its results database, by
+        default ``True``.
+
+    Returns
+    -------
+    list[:class:`JobReport`]
+        The report of each job, in the same order of `problems`.
+
+    Notes
+    -----
+    Where the worker processes are spawned (Windows and macOS), the script
+    calling this function must be protected by ``if __name__ == "__main__":``.
+    """
+    names = [problem.name for problem in problems]
+    duplicates = {name for name in names if names.count(name) > 1}
+    if duplicates:
+        raise ValueError(f"The names of the problems must be unique: {', '.join(sorted(duplicates))}")
+
+    reports = [None] * len(problems)
+    input_times = {}
+    for i, problem in enumerate(problems):
+        start = time.perf_counter()
+        try:
+            problem._prepare_analysis(path, erase_data=erase_data)
+            problem.write_input_file()
+        except Exception as error:
+            reports[i] = JobReport(problem, "failed", error, time.perf_counter() - start)
+        else:
+            input_times[i] = time.perf_counter() - start
+
+    workers = workers or os.cpu_count()
+    with _reader(extract, workers) as reader, ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(_run_job, problems[i], exe, verbose, reader): i for i in input_times}
+        for future in as_completed(futures):
+            i = futures[future]
+            error, run_time = future.result()
+            reports[i] = JobReport(problems[i], "failed" if error else "completed", error, input_times[i] + run_time)
+            if verbose:
+                print(f"{problems[i].name}: {reports[i].status} in {reports[i].time:.2f} s" + (f" ({error})" if error else ""))
+    return reports
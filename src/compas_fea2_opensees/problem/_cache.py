@@ -0,0 +1,179 @@
+"""On-disk cache of the results of OpenSees analyses."""
+
+import hashlib
+import os
+import re
+import shutil
+import tempfile
+
+import compas_fea2_opensees
+
+# Name of the results database in the cache, which does not depend on the
+# name of the problem, and suffixes of its files
+DATABASE_NAME = "results.db"
+DATABASE_SUFFIXES = ("", "-wal")
+
+# Line of the header of the input files that changes at each generation, and
+# is not part of the key of the results
+VOLATILE_LINE = re.compile(rb"^# Date: .*$", re.MULTILINE)
+
+
+def solver_version(exe):
+    """Identify a version of the OpenSees executable by its location, size
+    and modification time.
+
+    Parameters
+    ----------
+    exe : str
+        Location of the OpenSees executable.
+
+    Returns
+    -------
+    str
+    """
+    exe = os.path.realpath(exe)
+    stat = os.stat(exe)
+    return f"{exe}:{stat.st_size}:{int(stat.st_mtime)}"
+
+
+class AnalysisCache(object):
+    """Content-addressed cache of the results databases of OpenSees problems.
+
+    The results are stored under a hash of the input file of the problem,
+    of the version of the solver and of this backend, so that an identical
+    analysis is never run twice. When the cache is larger than `max_size`,
+    the least recently used results are evicted.
+
+    Parameters
+    ----------
+    path : str or pathlib.Path
+        Folder of the cache. It is created if it does not exist.
+    max_size : int, optional
+        Maximum size of the cache in bytes, by default 1 GB.
+
+    """
+
+    def __init__(self, path, max_size=1 << 30):
+        self.path = os.path.abspath(path)
+        self.max_size = max_size
+        os.makedirs(self.path, exist_ok=True)
+
+    def key(self, input_files, exe):
+        """Compute the key of the results of an analysis.
+
+        The date in the header of the input files is not part of the key, so
+        that the same problem written twice has the same key.
+
+        Parameters
+        ----------
+        input_files : str or list[str]
+            Path to the input file of the problem, or to the input file and the
+            files it sources.
+        exe : str
+            Location of the OpenSees executable.
+
+        Returns
+        -------
+        str
+        """
+        digest = hashlib.sha256()
+        digest.update(f"{solver_version(exe)}\n{compas_fea2_opensees.__version__}\n".encode())
+        if isinstance(input_files, str):
+            input_files = [input_files]
+        for input_file in input_files:
+            with open(input_file, "rb") as f:
+                # the header is in the first chunk
+                digest.update(VOLATILE_LINE.sub(b"", f.read(1 << 20), count=1))
+                for chunk in iter(lambda: f.read(1 << 20), b""):
+                    digest.update(chunk)
+        return digest.hexdigest()
+
+    def restore(self, key, database_path):
+        """Copy the cached results to the results database of a problem.
+
+        Parameters
+        ----------
+        key : str
+            Key of the results.
+        database_path : str
+            Path of the results database of the problem.
+
+        Returns
+        -------
+        bool
+            ``True`` if the results were in the cache, ``False`` otherwise.
+        """
+        entry = os.path.join(self.path, key)
+        if not os.path.isdir(entry):
+            return False
+        for suffix in DATABASE_SUFFIXES:
+            file_path = os.path.join(entry, DATABASE_NAME + suffix)
+            if os.path.exists(file_path):
+                shutil.copy2(file_path, database_path + suffix)
+            elif os.path.exists(database_path + suffix):
+                os.remove(database_path + suffix)
+        # mark the entry as recently used
+        os.utime(entry)
+        return True
+
+    def store(self, key, database_path):
+        """Store the results database of a problem in the cache and evict the
+        least recently used results if the cache is full.
+
+        Parameters
+        ----------
+        key : str
+            Key of the results.
+        database_path : str
+            Path of the results database of the problem.
+
+        Returns
+        -------
+        None
+        """
+        entry = os.path.join(self.path, key)
+        if os.path.isdir(entry):
+            os.utime(entry)
+            return
+        staging = tempfile.mkdtemp(dir=self.path, prefix=".")
+        for suffix in DATABASE_SUFFIXES:
+            if os.path.exists(database_path + suffix):
+                shutil.copy2(database_path + suffix, os.path.join(staging, DATABASE_NAME + suffix))
+        try:
+            os.replace(staging, entry)
+        except OSError:
+            # stored in the meanwhile by another process
+            shutil.rmtree(staging, ignore_errors=True)
+        self.evict()
+
+    def evict(self):
+        """Remove the least recently used results until the cache is not
+        larger than `max_size`.
+
+        Returns
+        -------
+        None
+        """
+        entries = []
+        for name in os.listdir(self.path):
+            entry = os.path.join(self.path, name)
+            if name.startswith(".") or not os.path.isdir(entry):
+                continue
+            size = sum(entry_file.stat().st_size for entry_file in os.scandir(entry))
+            entries.append((os.stat(entry).st_mtime, size, entry))
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+    def clear(self):
+        """Remove all the results from the cache.
+
+        Returns
+        -------
+        None
+        """
+        for name in os.listdir(self.path):
+            shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
@@ -0,0 +1,217 @@
+"""In-process execution of OpenSees problems through ``openseespy``.
+
+The model and step commands are the same generated for the Tcl input file, but
+instead of being written to disk and interpreted by an external OpenSees
+executable, they are passed one by one to the ``openseespy`` interpreter running
+in the current Python process. The results are read back directly from the
+domain (``nodeDisp``, ``nodeReaction``, ``eleResponse``, ``nodeEigenvector``)
+without writing any .out file.
+"""
+
+import math
+import os
+import shlex
+
+import numpy as np
+
+import compas_fea2_opensees
+from compas_fea2_opensees.utilities import stack_rows
+
+
+def _import_openseespy():
+    try:
+        import openseespy.opensees as ops
+    except ImportError as e:
+        raise ImportError("The in-process analysis requires openseespy: `pip install openseespy`.") from e
+    return ops
+
+
+def _parse_token(token):
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+def iter_commands(data):
+    """Split the generated input data into OpenSees commands.
+
+    Comments, empty lines and the braces delimiting the body of ``pattern``
+    and ``section`` blocks are skipped: in OpenSeesPy the commands following
+    these blocks are automatically assigned to them.
+
+    Parameters
+    ----------
+    data : iterable
+        Chunks of Tcl input data, as returned by the ``iter_jobdata`` methods.
+
+    Yields
+    ------
+    tuple
+        The name of the command and the list of its arguments.
+    """
+    tail = ""
+    for chunk in data:
+        lines = (tail + chunk).split("\n")
+        tail = lines.pop()
+        for line in lines:
+            command = _parse_line(line)
+            if command:
+                yield command
+    command = _parse_line(tail)
+    if command:
+        yield command
+
+
+def _parse_line(line):
+    line = line.split(";#")[0].strip()
+    if not line or line.startswith("#") or line == "}":
+        return None
+    if line.endswith("{"):
+        line = line[:-1].rstrip()
+    if "$" in line or "[" in line:
+        raise ValueError(f"Tcl expressions are not supported by the in-process analysis: {line}")
+    tokens = shlex.split(line)
+    return tokens[0], [_parse_token(token) for token in tokens[1:]]
+
+
+def run_commands(ops, data):
+    """Execute the generated input data with the OpenSeesPy interpreter.
+
+    Parameters
+    ----------
+    ops : module
+        The ``openseespy.opensees`` module.
+    data : iterable
+        Chunks of Tcl input data, as returned by the ``iter_jobdata`` methods.
+
+    Returns
+    -------
+    None
+    """
+    for name, args in iter_commands(data):
+        try:
+            getattr(ops, name)(*args)
+        except Exception as e:
+            raise RuntimeError(f"OpenSees command failed: {name} {' '.join(map(str, args))}") from e
+
+
+def analyse_in_process(problem, verbose=False):
+    """Run the analysis of a problem in the current process through ``openseespy``
+    and store the results in the results database of the problem.
+
+    Parameters
+    ----------
+    problem : :class:`compas_fea2_opensees.problem.OpenseesProblem`
+        The problem to analyse.
+    verbose : bool, optional
+        Print the progress of the analysis, by default ``False``.
+
+    Returns
+    -------
+    None
+    """
+    ops = _import_openseespy()
+    ops.wipe()
+    problem._renumber_nodes()
+    try:
+        with problem._renumbered_nodes():
+            run_commands(ops, problem.model.iter_jobdata())
+        with problem._loading_results():
+            for step in problem._steps_order:
+                if verbose:
+                    print(f"Running step {step.name} in-process...")
+                if isinstance(step, compas_fea2_opensees.OpenseesModalAnalysis):
+                    _run_modal_step(ops, problem, step)
+                elif isinstance(step, compas_fea2_opensees.OpenseesStaticStep):
+                    _run_static_step(ops, problem, step)
+                else:
+                    raise NotImplementedError(f"{step.__class__.__name__} is not supported by the in-process analysis.")
+    finally:
+        ops.wipe()
+
+
+def _run_static_step(ops, problem, step):
+    if step.multi_case:
+        return _run_multi_case_step(ops, problem, step)
+    with problem._renumbered_nodes():
+        run_commands(
+            ops,
+            [
+                step._generate_header_section(),
+                "\n",
+                step._generate_displacements_section(),
+                "\n",
+                step._generate_loads_section(),
+                "\n",
+                step._generate_analysis_section(),
+            ],
+        )
+    if ops.analyze(step.max_increments) != 0:
+        raise Exception("ERROR! - Analysis failed to converge!\nSet VERBOSE=True to check the error.")
+
+    _store_results(ops, problem, step)
+    ops.loadConst("-time", 0.0)
+
+
+def _run_multi_case_step(ops, problem, step):
+    with problem._renumbered_nodes():
+        run_commands(
+            ops,
+            [
+                step._generate_header_section(),
+                "\n",
+                step._generate_displacements_section(),
+                "\n",
+                step._generate_analysis_section(algorithm="Linear -factorOnce"),
+            ],
+        )
+    for index, load_case in enumerate(step.cases):
+        with problem._renumbered_nodes():
+            run_commands(ops, [step._generate_case_loads_section(index, load_case)])
+        if ops.analyze(step.max_increments) != 0:
+            raise Exception(f"ERROR! - Analysis of load case {load_case} failed!\nSet VERBOSE=True to check the error.")
+        _store_results(ops, problem, step, step_name=step.case_name(load_case))
+        ops.remove("loadPattern", index + 1)
+        ops.reset()
+
+
+def _store_results(ops, problem, step, step_name=None):
+    if step.field_outputs:
+        ops.reactions()
+        for field_output in step.field_outputs:
+            problem._store_field_results(step, field_output, *_field_results(ops, problem, field_output), step_name=step_name)
+
+
+def _field_results(ops, problem, field_output):
+    model = problem.model
+    group = getattr(field_output, "group", None)
+    if field_output.output_type == "node":
+        query = getattr(ops, field_output.response)
+        keys = sorted(node.key for node in (group.nodes if group is not None else model.nodes))
+        if problem.renumbering is not None:
+            keys = problem.renumbering.new_tags(keys).tolist()
+        rows = [query(key) for key in keys]
+    else:
+        keys = sorted(element.key for element in (group.elements if group is not None else model.elements))
+        rows = [ops.eleResponse(key, field_output.response) for key in keys]
+    return np.array(keys, dtype=int), stack_rows(rows)
+
+
+def _run_modal_step(ops, problem, step):
+    eigenvalues = []
+    eigenvectors = []
+    nodes = [node.key for node in problem.model.nodes]
+    tags = problem.renumbering.new_tags(nodes).tolist() if problem.renumbering is not None else nodes
+    for mode, lambda_ in enumerate(ops.eigen(step.modes), start=1):
+        omega = math.sqrt(lambda_)
+        freq = omega / (2.0 * math.pi)
+        eigenvalues.append([mode, lambda_, omega, freq, 1.0 / freq])
+        for tag in tags:
+            eigenvectors.append([mode, tag] + list(ops.nodeEigenvector(tag, mode)))
+    ops.modalProperties("-print", "-file", os.path.join(problem.path, "ModalReport.out"), "-unorm")
+    problem._store_modal_results(step, eigenvalues, eigenvectors)
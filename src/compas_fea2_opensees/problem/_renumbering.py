@@ -0,0 +1,106 @@
+"""Bandwidth-minimising renumbering of the nodes of the models."""
+
+from contextlib import contextmanager
+
+import numpy as np
+
+from ._systems import connectivity
+from ._systems import rcm_order
+
+
+def half_bandwidth(first, second):
+    """Half-bandwidth in nodes of the graph of a model.
+
+    Parameters
+    ----------
+    first, second : numpy.ndarray
+        Numbers of the nodes connected by each edge.
+
+    Returns
+    -------
+    int
+    """
+    return int(np.abs(first - second).max()) if len(first) else 0
+
+
+class NodeRenumbering(object):
+    """Reverse Cuthill-McKee renumbering of the nodes of a model.
+
+    The nodes keep the same set of keys, redistributed in the order given by
+    the reverse Cuthill-McKee algorithm on the graph of the nodes connected
+    by an element or a connector. The new keys are the tags of the nodes in
+    the input file, and are assigned to the nodes only while it is written
+    (see :meth:`applied`). The results written by OpenSees are mapped back to
+    the original keys with :meth:`original_keys`.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2_opensees.model.OpenseesModel`
+        The model, with the keys assigned.
+
+    Attributes
+    ----------
+    keys : numpy.ndarray
+        The original keys of the nodes, sorted.
+    tags : numpy.ndarray
+        The new key of each node, in the order of `keys`.
+    bandwidth : tuple
+        The half-bandwidth of the graph in nodes, with the original and the
+        new keys.
+
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.nodes = sorted((node for part in model.parts for node in part.nodes), key=lambda node: node.key)
+        self.keys, _, first, second = connectivity(model)
+        order = rcm_order(len(self.keys), first, second)
+        # the node in position order[i] gets the i-th key
+        self.tags = np.empty_like(self.keys)
+        self.tags[order] = self.keys
+        self._tags_order = np.argsort(self.tags)
+        positions = np.argsort(order)
+        self.bandwidth = (half_bandwidth(first, second), half_bandwidth(positions[first], positions[second]))
+
+    @contextmanager
+    def applied(self):
+        """Context manager assigning the new keys to the nodes, and restoring
+        the original ones on exit."""
+        for node, tag in zip(self.nodes, self.tags.tolist()):
+            node._key = tag
+        self.model._renumbered = True
+        try:
+            yield self
+        finally:
+            for node, key in zip(self.nodes, self.keys.tolist()):
+                node._key = key
+            self.model._renumbered = False
+
+    def original_keys(self, tags):
+        """Map the new keys of some nodes to the original ones.
+
+        Parameters
+        ----------
+        tags : array_like
+            The new keys, e.g. the tags of the nodes in the results of OpenSees.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        positions = np.searchsorted(self.tags, np.asarray(tags, dtype=np.int64), sorter=self._tags_order)
+        return self.keys[self._tags_order[positions]]
+
+    def new_tags(self, keys):
+        """Map the original keys of some nodes to the new ones.
+
+        Parameters
+        ----------
+        keys : array_like
+            The original keys.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        return self.tags[np.searchsorted(self.keys, np.asarray(keys, dtype=np.int64))]
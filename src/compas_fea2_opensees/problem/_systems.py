@@ -0,0 +1,172 @@
+"""Automatic selection of the system of equations of OpenSees analyses."""
+
+from collections import namedtuple
+
+import numpy as np
+from scipy.sparse import csr_matrix
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+
+# Bytes of a value of the matrix
+VALUE_SIZE = 8
+# Ratio between the non-zeros of the factors and of the matrix, estimated for
+# the fill-in of the sparse direct solvers with a minimum degree ordering
+SPARSE_FILL = 8
+# Bytes of the row index and column pointers of each non-zero of the sparse
+# systems
+INDEX_SIZE = 4
+
+SystemChoice = namedtuple("SystemChoice", ["system", "numberer", "dofs", "bandwidth", "symmetric", "memory"])
+SystemChoice.__doc__ = """System of equations selected for an analysis by :func:`select_system`.
+
+Attributes
+----------
+system : str
+    The ``system`` command, e.g. ``"UmfPack"``.
+numberer : str
+    The ``numberer`` command, e.g. ``"RCM"``.
+dofs : int
+    Number of degrees of freedom of the model.
+bandwidth : int
+    Half-bandwidth of the stiffness matrix in degrees of freedom, after the
+    nodes are renumbered with the reverse Cuthill-McKee algorithm, as done by
+    the ``RCM`` numberer.
+symmetric : bool
+    Whether the stiffness matrix is considered symmetric.
+memory : int
+    Estimated memory of the system of equations in bytes.
+"""
+
+
+def connectivity(model):
+    """Node-to-node connectivity of a model, from its elements and connectors.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2_opensees.model.OpenseesModel`
+        The model, with the keys assigned.
+
+    Returns
+    -------
+    tuple
+        The keys of the nodes, the number of degrees of freedom of each node,
+        and two arrays with the positions in the keys of the nodes connected by
+        each edge of the graph (without repetitions).
+    """
+    keys = []
+    ndf = []
+    for part in model.parts:
+        keys.extend(node.key for node in part.nodes)
+        ndf.extend([part.ndf] * len(part.nodes))
+    keys = np.array(keys, dtype=np.int64)
+    order = np.argsort(keys)
+    keys, ndf = keys[order], np.array(ndf, dtype=np.int64)[order]
+
+    # the members with the same number of nodes are processed together
+    members = {}
+    for nodes in [element.nodes for part in model.parts for element in part.elements] + [connector.nodes for connector in model.connectors]:
+        members.setdefault(len(nodes), []).append([node.key for node in nodes])
+    first, second = [np.zeros(0, dtype=np.int64)], [np.zeros(0, dtype=np.int64)]
+    for n_nodes, members_keys in members.items():
+        positions = np.searchsorted(keys, np.array(members_keys, dtype=np.int64))
+        i, j = np.triu_indices(n_nodes, 1)
+        first.append(np.minimum(positions[:, i], positions[:, j]).ravel())
+        second.append(np.maximum(positions[:, i], positions[:, j]).ravel())
+    # each edge is encoded in a single integer to remove the repetitions
+    edges = np.unique(np.concatenate(first) * len(keys) + np.concatenate(second))
+    first, second = np.divmod(edges, len(keys))
+    distinct = first != second
+    return keys, ndf, first[distinct], second[distinct]
+
+
+def rcm_order(n, first, second):
+    """Reverse Cuthill-McKee ordering of the nodes of a model.
+
+    Parameters
+    ----------
+    n : int
+        Number of nodes.
+    first, second : numpy.ndarray
+        Positions of the nodes connected by each edge.
+
+    Returns
+    -------
+    numpy.ndarray
+        The positions of the nodes in the new order.
+    """
+    graph = csr_matrix((np.ones(len(first)), (first, second)), shape=(n, n))
+    return reverse_cuthill_mckee((graph + graph.T).tocsr(), symmetric_mode=True)
+
+
+def estimate_memory(ndf, first, second):
+    """Estimate the memory of the stiffness matrix of a model stored by the
+    banded, profile and sparse systems of OpenSees.
+
+    Parameters
+    ----------
+    ndf : numpy.ndarray
+        Number of degrees of freedom of each node, in the order of numbering.
+    first, second : numpy.ndarray
+        Positions of the nodes connected by each edge, ``first < second``.
+
+    Returns
+    -------
+    tuple
+        The half-bandwidth in degrees of freedom and a dictionary with the
+        estimated memory in bytes of ``"BandGeneral"``, ``"ProfileSPD"`` and
+        of the sparse direct systems (``"UmfPack"``).
+    """
+    offsets = np.concatenate([[0], np.cumsum(ndf)])
+    dofs = int(offsets[-1])
+    # first degree of freedom coupled with each node
+    lowest = offsets[:-1].copy()
+    np.minimum.at(lowest, second, offsets[first])
+    heights = offsets[1:] - lowest
+    bandwidth = int(heights.max()) - 1 if len(heights) else 0
+    # non-zeros of the upper triangle: the diagonal blocks and the edges
+    nonzeros = int(np.sum(ndf * (ndf + 1) // 2) + np.sum(ndf[first] * ndf[second]))
+    return bandwidth, {
+        # LAPACK band storage, with room for the pivoting
+        "BandGeneral": VALUE_SIZE * dofs * (3 * bandwidth + 1),
+        # skyline of the upper triangle, column by column
+        "ProfileSPD": VALUE_SIZE * int(np.sum(ndf * heights)),
+        "UmfPack": (VALUE_SIZE + INDEX_SIZE) * (2 * nonzeros - dofs) * SPARSE_FILL,
+    }
+
+
+def select_system(model, symmetric=False, parallel=False):
+    """Select the system of equations and the numberer with the lowest
+    estimated memory for a model.
+
+    ``ProfileSPD`` is only considered for symmetric (positive definite)
+    matrices. The banded and profile systems are paired with the ``RCM``
+    numberer, which reduces their bandwidth, so their memory is estimated
+    with the nodes in the reverse Cuthill-McKee order. The sparse systems are
+    paired with the ``AMD`` numberer, which reduces their fill-in. The parallel analyses
+    always use the distributed sparse solver ``Mumps``, with the
+    ``ParallelPlain`` numberer.
+
+    Parameters
+    ----------
+    model : :class:`compas_fea2_opensees.model.OpenseesModel`
+        The model, with the keys assigned.
+    symmetric : bool, optional
+        Whether the stiffness matrix is symmetric, by default ``False``.
+    parallel : bool, optional
+        Whether the analysis runs on many processes, by default ``False``.
+
+    Returns
+    -------
+    :class:`SystemChoice`
+    """
+    _, ndf, first, second = connectivity(model)
+    order = rcm_order(len(ndf), first, second)
+    positions = np.argsort(order)
+    first, second = np.minimum(positions[first], positions[second]), np.maximum(positions[first], positions[second])
+    bandwidth, memory = estimate_memory(ndf[order], first, second)
+    if parallel:
+        return SystemChoice("Mumps", "ParallelPlain", int(ndf.sum()), bandwidth, symmetric, memory["UmfPack"])
+    if not symmetric:
+        del memory["ProfileSPD"]
+    system = min(memory, key=memory.get)
+    numberer = "AMD" if system == "UmfPack" else "RCM"
+    return SystemChoice(system, numberer, int(ndf.sum()), bandwidth, symmetric, memory[system])
@@ -1,4 +1,7 @@
 import os
+import shutil
+from contextlib import contextmanager
+
 import numpy as np
 
 
@@ -8,16 +11,207 @@ from compas_fea2.utilities._utils import timer
 from compas_fea2.utilities._utils import with_spinner
 
 import compas_fea2_opensees
+from compas_fea2_opensees.results.envelopes import envelope
+from compas_fea2_opensees.results.superposition import superpose
+from compas_fea2_opensees.utilities import join_lines
+from compas_fea2_opensees.utilities import quote_identifier
+from compas_fea2_opensees.utilities import read_table
+from ._async import analyse_async
+from ._async import analysis_events
+from ._openseespy import analyse_in_process
+from ._renumbering import NodeRenumbering
+from .steps.static import CHECKPOINTS_FOLDER
 from compas_fea2.results.database import SQLiteResultsDatabase
 
+# PRAGMAs applied to the results database while the results are loaded
+FAST_LOAD_PRAGMAS = {"journal_mode": "WAL", "synchronous": "OFF"}
+
+
+def read_binary_results(path, field_name, n_columns):
+    """Read the results written by a binary recorder of OpenSees.
+
+    The recorder writes `n_columns` doubles per member in each record, for
+    the members listed in the ``{field_name}.tags`` file. The file is memory
+    mapped and only the last record is read.
+
+    Parameters
+    ----------
+    path : str
+        Path to the folder with the results.
+    field_name : str
+        Name of the field.
+    n_columns : int
+        Number of values per member.
+
+    Returns
+    -------
+    tuple
+        The keys of the members and the 2D array with their values.
+    """
+    keys = read_table(os.path.join(path, f"{field_name}.tags")).ravel().astype(int)
+    if not len(keys):
+        return keys, np.zeros((0, n_columns))
+    record_size = len(keys) * n_columns * 8
+    data = np.memmap(os.path.join(path, f"{field_name}.bin"), dtype=np.uint8, mode="r")
+    # NOTE: depending on the version, OpenSees ends each record with a new line
+    if len(data) % (record_size + 1) == 0 and len(data) % record_size != 0:
+        record_size += 1
+    record = data[len(data) - record_size :][: len(keys) * n_columns * 8]
+    return keys, np.frombuffer(record, dtype="<f8").reshape(len(keys), n_columns)
+
+
+def read_text_results(path, field_name):
+    """Read the results written by a text recorder of OpenSees.
+
+    Parameters
+    ----------
+    path : str
+        Path to the folder with the results.
+    field_name : str
+        Name of the field.
+
+    Returns
+    -------
+    tuple
+        The keys of the members and the 2D array with their values.
+    """
+    table = read_table(os.path.join(path, f"{field_name}.out"))
+    return table[:, 0].astype(int), table[:, 1:]
+
+
+def merge_rank_results(results, sum_duplicates=False):
+    """Merge the results written by the ranks of a parallel analysis.
+
+    The nodes on the interface between subdomains are in the results of all
+    their ranks. Their results are either taken from the first rank (e.g. the
+    displacements, which are the same in all the ranks), or summed (e.g. the
+    reactions, to which each rank contributes with its own elements).
+
+    Parameters
+    ----------
+    results : list[tuple]
+        The keys of the members and the 2D array with their values, for each
+        rank.
+    sum_duplicates : bool, optional
+        Sum the results of the members in more than one rank, by default
+        ``False``.
+
+    Returns
+    -------
+    tuple
+        The keys of the members, sorted, and the 2D array with their values.
+    """
+    width = max(values.shape[1] for _, values in results)
+    keys = np.concatenate([keys for keys, _ in results])
+    values = np.vstack([np.pad(values, ((0, 0), (0, width - values.shape[1])), constant_values=np.nan) for _, values in results])
+    if not sum_duplicates:
+        keys, first = np.unique(keys, return_index=True)
+        return keys, values[first]
+    keys, positions = np.unique(keys, return_inverse=True)
+    merged = np.zeros((len(keys), width))
+    np.add.at(merged, positions, values)
+    return keys, merged
+
+
+def shell_stresses(values, counts, thicknesses):
+    """Convert the generalised stresses of shell elements at the integration
+    points into the average true stresses of the elements.
+
+    Elements with a different number of integration points (e.g. triangles
+    and quadrilaterals) are processed in groups, each as a single
+    ``(n_elements, n_integration_points, 8)`` array averaged along the
+    integration points.
+
+    Parameters
+    ----------
+    values : numpy.ndarray
+        2D array with the 8 generalised stresses (membrane forces, bending
+        moments and shear forces per unit length) at each integration point,
+        one row per element.
+    counts : numpy.ndarray
+        Number of values of each element.
+    thicknesses : numpy.ndarray
+        Thickness of each element.
+
+    Returns
+    -------
+    numpy.ndarray
+        2D array with the true stresses sigma_11, sigma_22, tau_12, sigma_b11,
+        sigma_b22, sigma_b12, tau_q1 and tau_q2 of each element.
+    """
+    n_components = 8
+    averages = np.zeros((len(values), n_components))
+    n_points = counts // n_components
+    for n in np.unique(n_points[n_points > 0]).tolist():
+        rows = np.flatnonzero(n_points == n)
+        averages[rows] = values[rows, : n * n_components].reshape(len(rows), n, n_components).mean(axis=1)
+
+    # NOTE: The OpenSees output is generalised stress,
+    # so we need to convert it to True stress
+    t = thicknesses[:, None]
+    # Assuming shear area = 5/6 * t
+    return averages * np.hstack([np.repeat(1 / t, 3, axis=1), np.repeat(6 / t**2, 3, axis=1), np.repeat(1 / (t * 5 / 6), 2, axis=1)])
+
 
 class OpenseesProblem(Problem):
-    """OpenSees implementation of the :class:`Problem`.\n"""
+    """OpenSees implementation of the :class:`Problem`.
+
+    Additional Parameters
+    ---------------------
+    fast_db_load : bool, optional
+        Load the results in the database with the ``FAST_LOAD_PRAGMAS``
+        (write-ahead log and no disk synchronisation), by default ``False``.
+        The loading is limited by the disk throughput, but the database might
+        get corrupted if the system crashes while the results are loaded.
+    output_format : str, optional
+        Format of the files with the results of the node field outputs, either
+        ``"text"`` (default) or ``"binary"``. In binary mode the results are
+        written by OpenSees ``recorder Node -binary`` commands and read back
+        by memory mapping the files, which is much faster for large models.
+        The element field outputs are always written as text.
+    incremental : bool, optional
+        Write the model block of the input file to a separate file, shared by
+        the problems analysed in the same folder and regenerated only when the
+        model changes, by default ``False``. See :meth:`OpenseesModel.mark_dirty`.
+    renumber_nodes : bool, optional
+        Renumber the nodes with the reverse Cuthill-McKee algorithm in the
+        input file, by default ``False``. The new numbering reduces the
+        bandwidth of the stiffness matrix, while the model and the results
+        database keep the original keys.
+
+    Notes
+    -----
+    The analysis can run on many processes of the local host with ``mpiexec``
+    (see the `processes` parameter of :meth:`analyse`). With OpenSeesSP the
+    input file is the same and the domain is partitioned by OpenSees. With
+    OpenSeesMP each rank builds only its own subdomain, written in the
+    ``{name}.{rank}.tcl`` input file, and writes its results in the
+    ``rank{rank}`` folder. The results of the ranks are merged when they are
+    extracted.
+
+    The static steps with a `restart` frequency save the state of the domain
+    at regular checkpoints. If the analysis is interrupted, :meth:`resume`
+    continues it from the last checkpoint of each step.
+
+    """
 
     __doc__ += Problem.__doc__
 
-    def __init__(self, description=None, **kwargs):
+    def __init__(self, description=None, fast_db_load=False, output_format="text", incremental=False, renumber_nodes=False, **kwargs):
         super(OpenseesProblem, self).__init__(description=description, **kwargs)
+        if output_format not in ("text", "binary"):
+            raise ValueError(f"Invalid output format {output_format}. Use either 'text' or 'binary'.")
+        self.fast_db_load = fast_db_load
+        self.output_format = output_format
+        self.incremental = incremental
+        self.renumber_nodes = renumber_nodes
+        self.renumbering = None
+        self.processes = None
+        self.parallel = None
+        self.subdomains = None
+        self._subdomain = None
+        self._members_index = None
+        self._reader = None
 
     # =========================================================================
     #                         Analysis methods
@@ -25,7 +219,7 @@ class OpenseesProblem(Problem):
 
     # @timer(message="Analysis completed in")
     @with_spinner("Analysis in progress")
-    def analyse(self, path, exe=None, erase_data=False, verbose=False, *args, **kwargs):
+    def analyse(self, path, exe=None, erase_data=False, verbose=False, in_process=False, processes=None, parallel="sp", *args, **kwargs):
         """Runs the analysis through the OpenSees solver.
 
         Parameters
@@ -38,28 +232,250 @@ class OpenseesProblem(Problem):
             Location of the OpenSees executable, by default ``C:/OpenSees3.2.0/bin/OpenSees.exe``.
         verbose : bool, optional
             Decide whether to print the output from the solver, by default ``False``.
+        in_process : bool, optional
+            Run the analysis in the current process through ``openseespy``
+            instead of launching the OpenSees executable, by default ``False``.
+            The results are stored directly in the results database, without
+            writing the input file and the .out files.
+        processes : int, optional
+            Number of MPI processes running the analysis with ``mpiexec`` on
+            the local host, by default ``None`` (a single OpenSees process).
+            The static steps are solved with the ``Mumps`` system and the
+            ``ParallelPlain`` numberer.
+        parallel : str, optional
+            Parallel interpreter used with `processes`, either ``"sp"``
+            (default) for OpenSeesSP, which partitions the domain itself, or
+            ``"mp"`` for OpenSeesMP, where each rank builds its own subdomain.
+            The default executables are ``compas_fea2_opensees.EXE_SP`` and
+            ``compas_fea2_opensees.EXE_MP``.
 
         Returns
         -------
         None
         """
-        self._check_analysis_path(path, erase_data=erase_data)
+        self._prepare_analysis(path, erase_data=erase_data, processes=processes, parallel=parallel, in_process=in_process)
+        if in_process:
+            if self._checkpointed_steps:
+                raise ValueError("Checkpoints are not supported by the in-process analysis.")
+            if any(getattr(step, "adaptive", False) for step in self._steps_order):
+                raise ValueError("Adaptive increments are not supported by the in-process analysis.")
+            analyse_in_process(self, verbose=verbose)
+            print("Analysis completed!")
+            return
+        self.write_input_file()
+        self._launch_solver(exe=exe, verbose=verbose)
+        print("Analysis completed!")
+
+    @with_spinner("Analysis in progress")
+    def resume(self, path=None, exe=None, verbose=False):
+        """Resumes an interrupted analysis from the last checkpoints of its
+        steps.
+
+        The input file is written again, so the problem must be the same that
+        was interrupted. The steps restore the state of the domain saved at
+        their last checkpoint and analyse only the remaining increments. The
+        results can then be extracted with :meth:`extract_results`.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path, optional
+            Path to the analysis folder of the interrupted analysis, by default
+            the folder of the last analysis of the problem.
+        exe : str, optional
+            Location of the OpenSees executable, by default ``compas_fea2_opensees.EXE``.
+        verbose : bool, optional
+            Decide whether to print the output from the solver, by default ``False``.
+
+        Returns
+        -------
+        None
+
+        Raises
+        ------
+        ValueError
+            If there are no checkpoints in the analysis folder.
+        """
+        self._check_analysis_path(path, erase_data=False)
+        if not os.path.isdir(os.path.join(self.path, CHECKPOINTS_FOLDER)):
+            raise ValueError(f"No checkpoints to resume the analysis from in {self.path}.")
         self.model.assign_keys(start=self.model._key)
+        self._set_parallel(None, None)
         self.write_input_file()
+        self._launch_solver(exe=exe, verbose=verbose)
+        print("Analysis completed!")
+
+    @property
+    def _checkpointed_steps(self):
+        """list : The static steps saving checkpoints."""
+        return [step for step in self._steps_order if isinstance(step, compas_fea2_opensees.OpenseesStaticStep) and step.restart and not step.multi_case]
+
+    def _clear_checkpoints(self):
+        """Remove the checkpoints of a previous analysis in the analysis folder,
+        which would be restored by the new analysis."""
+        shutil.rmtree(os.path.join(self.path, CHECKPOINTS_FOLDER), ignore_errors=True)
+
+    def _prepare_analysis(self, path, erase_data=False, processes=None, parallel="sp", in_process=False):
+        """Prepare a new analysis of the problem: set the analysis folder, the
+        keys of the model and the parallel execution, and remove the
+        checkpoints of a previous analysis in the folder, which would
+        otherwise be restored."""
+        self._check_analysis_path(path, erase_data=erase_data)
+        self.model.assign_keys(start=self.model._key)
+        self._set_parallel(processes, parallel, in_process=in_process)
+        if not in_process:
+            self._clear_checkpoints()
+
+    def _set_parallel(self, processes, parallel, in_process=False):
+        """Set the parallel execution of the next analysis."""
+        if not processes:
+            self.processes = self.parallel = self.subdomains = None
+            return
+        if parallel not in ("sp", "mp"):
+            raise ValueError(f"Invalid parallel interpreter {parallel}. Use either 'sp' or 'mp'.")
+        if in_process:
+            raise ValueError("Parallel analyses cannot run in process.")
+        if parallel == "mp" and any(isinstance(step, compas_fea2_opensees.OpenseesModalAnalysis) for step in self.steps):
+            raise ValueError("Modal analyses are not supported by OpenSeesMP.")
+        if self._checkpointed_steps:
+            raise ValueError("Checkpoints are not supported by the parallel analyses.")
+        self.processes = int(processes)
+        self.parallel = parallel
+        self.subdomains = None
+
+    def _local_node_load(self, node_load):
+        """Select the nodal loads applied by the rank whose input file is
+        being written: all of them, unless the model is partitioned.
+
+        Parameters
+        ----------
+        node_load : list
+            Pairs of node and load.
+
+        Returns
+        -------
+        list
+        """
+        if self._subdomain is None:
+            return node_load
+        return [(node, load) for node, load in node_load if node in self._subdomain.owned_nodes]
+
+    def _renumber_nodes(self):
+        """Compute the renumbering of the nodes of the model for the next
+        input file, if `renumber_nodes` is set."""
+        self.renumbering = NodeRenumbering(self.model) if self.renumber_nodes else None
+
+    @contextmanager
+    def _renumbered_nodes(self):
+        """Context manager assigning the keys of the renumbering of the nodes,
+        if any, while the input of the analysis is generated."""
+        if self.renumbering is None:
+            yield
+            return
+        with self.renumbering.applied():
+            yield
+
+    def _node_keys(self, tags):
+        """Map the tags of the nodes in the results of OpenSees to their keys.
+
+        Parameters
+        ----------
+        tags : array_like
+            The tags.
+
+        Returns
+        -------
+        numpy.ndarray
+        """
+        if self.renumbering is None:
+            return np.asarray(tags, dtype=int)
+        return self.renumbering.original_keys(tags)
+
+    def _launch_solver(self, exe=None, verbose=False):
+        """Run the OpenSees executable on the input file of the problem, which
+        must have already been written.
+
+        Parameters
+        ----------
+        exe : str, optional
+            Location of the OpenSees executable, by default ``compas_fea2_opensees.EXE``.
+        verbose : bool, optional
+            Decide whether to print the output from the solver, by default ``False``.
+
+        Returns
+        -------
+        None
+        """
         filepath = os.path.join(self.path, self.name + ".tcl")
 
-        exe = exe or compas_fea2_opensees.EXE
-        if not os.path.exists(exe):
+        exe = exe or self._default_exe()
+        if not exe or not os.path.exists(exe):
             raise ValueError(f"backend not found at {exe}")
 
-        cmd = 'cd "{}" && "{}" "{}"'.format(self.path, exe, filepath)
+        if self.processes:
+            cmd = 'cd "{}" && "{}" -n {} "{}" "{}"'.format(self.path, compas_fea2_opensees.MPIEXEC, self.processes, exe, filepath)
+        else:
+            cmd = 'cd "{}" && "{}" "{}"'.format(self.path, exe, filepath)
         for line in launch_process(cmd_args=cmd, cwd=self.path, verbose=verbose):
             line = line.strip()
             if "error" in line.split(" "):
-                raise Exception("ERROR! - Analysis failed to converge!\nSet VERBOSE=True to check the error.")
-        print("Analysis completed!")
+                raise Exception(f"ERROR! - Analysis failed to converge!\n{line}\nSet VERBOSE=True to check the error.")
+
+    def _default_exe(self):
+        """Location of the OpenSees executable for the parallel interpreter
+        of the analysis."""
+        return {None: compas_fea2_opensees.EXE, "sp": compas_fea2_opensees.EXE_SP, "mp": compas_fea2_opensees.EXE_MP}[self.parallel]
+
+    async def analyse_async(self, path, exe=None, erase_data=False, timeout=None, on_event=None):
+        """Runs the analysis through the OpenSees solver in a subprocess,
+        without blocking the event loop.
 
-    def analyse_and_extract(self, path, exe=None, erase_data=False, verbose=False, *args, **kwargs):
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path to the analysis folder. A new folder with the name
+            of the problem will be created at this location for all the required
+            analysis files.
+        exe : str, optional
+            Location of the OpenSees executable, by default ``compas_fea2_opensees.EXE``.
+        erase_data : bool, optional
+            Erase the existing data in the analysis folder, by default ``False``.
+        timeout : float, optional
+            Maximum duration of the analysis in seconds, by default no limit.
+            When it expires, OpenSees is killed and ``asyncio.TimeoutError``
+            is raised. OpenSees is killed also if the task is cancelled.
+        on_event : callable, optional
+            Function called with each :class:`AnalysisEvent` of the analysis.
+
+        Returns
+        -------
+        None
+        """
+        await analyse_async(self, path, exe=exe, erase_data=erase_data, timeout=timeout, on_event=on_event)
+
+    def analysis_events(self, path, exe=None, erase_data=False, timeout=None):
+        """Runs the analysis through the OpenSees solver in a subprocess and
+        streams its output.
+
+        Parameters
+        ----------
+        path : str or pathlib.Path
+            Path to the analysis folder.
+        exe : str, optional
+            Location of the OpenSees executable, by default ``compas_fea2_opensees.EXE``.
+        erase_data : bool, optional
+            Erase the existing data in the analysis folder, by default ``False``.
+        timeout : float, optional
+            Maximum duration of the analysis in seconds, by default no limit.
+
+        Returns
+        -------
+        async iterator
+            The :class:`AnalysisEvent` of the analysis, as they are printed
+            by OpenSees.
+        """
+        return analysis_events(self, path, exe=exe, erase_data=erase_data, timeout=timeout)
+
+    def analyse_and_extract(self, path, exe=None, erase_data=False, verbose=False, in_process=False, cache=None, processes=None, parallel="sp", *args, **kwargs):
         """Runs the analysis through the OpenSees solver and extract the results
         from the native format into a SQLite database. The Model is also saved as
         .cfm file.
@@ -74,6 +490,20 @@ class OpenseesProblem(Problem):
             Location of the OpenSees executable, by default ``C:/OpenSees3.2.0/bin/OpenSees.exe``.
         verbose : bool, optional
             Decide wether print or not the output from the solver, by default ``False``.
+        in_process : bool, optional
+            Run the analysis in the current process through ``openseespy``,
+            by default ``False``. The results are stored during the analysis,
+            so no extraction is needed.
+        cache : :class:`compas_fea2_opensees.problem.AnalysisCache`, optional
+            Cache of the results. If the results of an identical input file
+            analysed with the same solver are in the cache, they are copied in
+            the analysis folder without running the analysis. Otherwise, the
+            results are stored in the cache after the extraction.
+        processes : int, optional
+            Number of MPI processes running the analysis, see :meth:`analyse`.
+        parallel : str, optional
+            Parallel interpreter used with `processes`, ``"sp"`` or ``"mp"``,
+            see :meth:`analyse`.
 
         Returns
         -------
@@ -81,10 +511,32 @@ class OpenseesProblem(Problem):
 
         """
         self.model.assign_keys(start=self.model._key)
-        self.analyse(path=path, exe=exe, erase_data=erase_data, verbose=verbose, *args, **kwargs)
+        if cache is not None and not in_process:
+            return self._analyse_and_extract_cached(path, cache, exe=exe, erase_data=erase_data, verbose=verbose, processes=processes, parallel=parallel)
+        self.analyse(path=path, exe=exe, erase_data=erase_data, verbose=verbose, in_process=in_process, processes=processes, parallel=parallel, *args, **kwargs)
+        if in_process:
+            return
         self.extract_results(database_path=path, database_name=self.name, field_output=None)
         return self.extract_results()
 
+    def _analyse_and_extract_cached(self, path, cache, exe=None, erase_data=False, verbose=False, processes=None, parallel="sp"):
+        self._prepare_analysis(path, erase_data=erase_data, processes=processes, parallel=parallel)
+        self.write_input_file()
+        exe = exe or self._default_exe()
+        input_files = [os.path.join(self.path, self.name + ".tcl")]
+        if self.subdomains:
+            input_files.extend(os.path.join(self.path, f"{self.name}.{domain.rank}.tcl") for domain in self.subdomains)
+        elif self.incremental:
+            input_files.append(self.model._model_file[0])
+        key = cache.key(input_files, exe)
+        if cache.restore(key, self.path_db):
+            print("Results restored from the cache!")
+            return
+        self._launch_solver(exe=exe, verbose=verbose)
+        print("Analysis completed!")
+        self.extract_results()
+        cache.store(key, self.path_db)
+
     # =============================================================================
     #                               Job data
     # =============================================================================
@@ -103,6 +555,16 @@ class OpenseesProblem(Problem):
         """
         return "\n".join([step.jobdata() for step in self._steps_order])
 
+    def iter_jobdata(self):
+        """Generates the input file data of the problem one step at a time.
+
+        Yields
+        ------
+        str
+            Consecutive chunks of the problem data.
+        """
+        return join_lines(step.jobdata() for step in self._steps_order)
+
     # =========================================================================
     #                           Optimisation methods
     # =========================================================================
@@ -127,137 +589,371 @@ class OpenseesProblem(Problem):
         """
         print("Extracting data from Opensees .out files...")
 
-        rdb = self.rdb
-        model = self.model
-        for step in self.steps:
-            if isinstance(step, compas_fea2_opensees.OpenseesModalAnalysis):
-                problem_path = step.problem.path
-                model = step.model
-
-                eigenvalues = []
-                with open(os.path.join(problem_path, "eigenvalues.out"), "r") as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        eigenvalues.append(line.split())
-
-                eigenvectors = []
-                with open(os.path.join(problem_path, "eigenvectors.out"), "r") as f:
-                    lines = f.readlines()
-                    for line in lines:
-                        eigenvectors.append(line.split())
-
-                cursor = rdb.connection.cursor()
-
-                # Create table for eigenvalues
-                cursor.execute(
-                    """
-                CREATE TABLE IF NOT EXISTS eigenvalues (
-                    id INTEGER PRIMARY KEY,
-                    step TEXT,
-                    mode INTEGER,
-                    lambda REAL,
-                    omega REAL,
-                    freq REAL,
-                    period REAL
-                    )
-                """
-                )
+        with self._loading_results():
+            for step in self.steps:
+                if isinstance(step, compas_fea2_opensees.OpenseesModalAnalysis):
+                    problem_path = step.problem.path
 
-                # Insert eigenvalues into the database
-                for eigenvalue in eigenvalues:
-                    cursor.execute(
-                        """
-                    INSERT INTO eigenvalues (step, mode, lambda, omega, freq, period)
-                    VALUES (?, ?, ?, ?, ?, ?)
-                    """,
-                        [step.name] + eigenvalue,
-                    )
-                rdb.connection.commit()
-
-                for i, eigenvector in enumerate(eigenvectors):
-                    if len(eigenvector) < 8:
-                        eigenvector = eigenvector + [0.0] * (8 - len(eigenvector))
-                    node = model.find_node_by_key(int(eigenvector[1]))[0]
-                    eigenvectors[i] = [eigenvector[0], step.name, node.part.name, node.key] + eigenvector[2:]
-
-                # Create table for modal shapes
-                cursor.execute(
-                    f"""
-                CREATE TABLE IF NOT EXISTS eigenvectors (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    mode INTEGER,
-                    step TEXT,
-                    part TEXT,
-                    key INTEGER,
-                    {",\n".join([f"{c} REAL" for c in ['x', 'y', 'z', 'xx', 'yy', 'zz']])}
-                    )
-                """
-                )
-                # Insert modal shape data into the database
-                for eigenvector in eigenvectors:
-                    cursor.execute(
-                        f"""
-                    INSERT INTO eigenvectors (mode, step, part, key, {", ".join([c for c in ['x', 'y', 'z', 'xx', 'yy', 'zz']])})
-                    VALUES (?, ?, ?, ?, ?, ? ,?, ?, ?, ?)
-                    """,
-                        eigenvector,
-                    )
+                    eigenvalues = []
+                    with open(os.path.join(problem_path, "eigenvalues.out"), "r") as f:
+                        lines = f.readlines()
+                        for line in lines:
+                            eigenvalues.append(line.split())
+
+                    eigenvectors = []
+                    with open(os.path.join(problem_path, "eigenvectors.out"), "r") as f:
+                        lines = f.readlines()
+                        for line in lines:
+                            eigenvectors.append(line.split())
+
+                    self._store_modal_results(step, eigenvalues, eigenvectors)
+
+                    print(f"Modal shapes and eigenvalues successfully saved to {problem_path}")
+
+                else:
+                    # the results of each load case of a multi-case step are in separate files
+                    if getattr(step, "multi_case", False):
+                        runs = [(step.case_name(load_case), f"_{index}") for index, load_case in enumerate(step.cases)]
+                    else:
+                        runs = [(step.name, "")]
+                    for step_name, suffix in runs:
+                        for field_output in step.field_outputs:
+                            keys, values = self._read_field_results(field_output, field_output.field_name + suffix)
+                            self._store_field_results(step, field_output, keys, values, step_name=step_name)
 
-                rdb.connection.commit()
+                print("Results extraction completed!")
 
-                print(f"Modal shapes and eigenvalues successfully saved to {problem_path}")
+    def _read_field_results(self, field_output, field_name):
+        """Read the results of a field output from the files written by
+        OpenSees, merging those of the ranks of an OpenSeesMP analysis.
 
+        Parameters
+        ----------
+        field_output : obj
+            The field output.
+        field_name : str
+            Name of the files with the results.
+
+        Returns
+        -------
+        tuple
+            The keys of the members and the 2D array with their values.
+        """
+        if self.parallel == "mp":
+            folders = [os.path.join(self.path, f"rank{rank}") for rank in range(self.processes)]
+        else:
+            folders = [field_output.problem.path]
+        if self.output_format == "binary" and field_output.output_type == "node":
+            reads = [(read_binary_results, folder, field_name, len(field_output.components_names)) for folder in folders]
+        else:
+            reads = [(read_text_results, folder, field_name) for folder in folders]
+        executor = getattr(self, "_reader", None)
+        if executor is None:
+            results = [read(*args) for read, *args in reads]
+        else:
+            # the files are parsed in the worker processes of the executor
+            results = [future.result() for future in [executor.submit(*read) for read in reads]]
+        if len(results) == 1:
+            return results[0]
+        results = [(keys, values) for keys, values in results if len(keys)] or results[:1]
+        return merge_rank_results(results, sum_duplicates=field_output.response == "nodeReaction")
+
+    def superpose_results(self, step, combinations, field_outputs=None):
+        """Compute the results of load combinations by linear superposition of
+        the results of the load cases of a multi-case step, without running
+        the analysis again.
+
+        Parameters
+        ----------
+        step : :class:`compas_fea2_opensees.problem.OpenseesStaticStep`
+            A step analysed with ``multi_case=True``, whose results have been
+            extracted.
+        combinations : list[:class:`compas_fea2.problem.LoadCombination`]
+            The combinations. The cases not in the factors of a combination
+            are not included in it.
+        field_outputs : list, optional
+            The field outputs to combine, by default all the field outputs of
+            the step.
+
+        Returns
+        -------
+        list[str]
+            The names under which the results of the combinations are stored,
+            in the same order of `combinations`.
+        """
+        if not getattr(step, "multi_case", False):
+            raise ValueError(f"The load cases of {step.name} are not solved separately: set multi_case=True.")
+        cases = step.cases
+        factors = [[combination.factors.get(load_case, 0.0) for load_case in cases] for combination in combinations]
+        names = [step.case_name(combination.name) for combination in combinations]
+        for field_output in field_outputs or step.field_outputs:
+            superpose(
+                self.rdb.connection,
+                field_output.field_name,
+                field_output.components_names,
+                [step.case_name(load_case) for load_case in cases],
+                factors,
+                names,
+            )
+        return names
+
+    def envelope_results(self, field_outputs, steps=None, name="envelope"):
+        """Compute the envelopes (minimum, maximum and largest magnitude, with
+        the governing step) of the results of some steps, load cases or
+        combinations, and store them in the results database.
+
+        Parameters
+        ----------
+        field_outputs : list
+            The field outputs to envelope.
+        steps : list[str], optional
+            The names under which the results to envelope are stored (the
+            names of the steps, or the names returned by
+            :meth:`superpose_results` and ``case_name``), by default all the
+            results of each field.
+        name : str, optional
+            Name of the envelope, by default ``"envelope"``. An envelope with
+            the same name is replaced.
+
+        Returns
+        -------
+        list[str]
+            The names of the envelope tables, in the same order of
+            `field_outputs`, read with
+            :func:`compas_fea2_opensees.results.read_envelope`.
+        """
+        connection = self.rdb.connection
+        tables = []
+        for field_output in field_outputs:
+            table = field_output.field_name
+            if steps is None:
+                names = [row[0] for row in connection.execute(f"SELECT DISTINCT step FROM {quote_identifier(table)} ORDER BY step")]
             else:
-                for field_output in step.field_outputs:
+                names = list(steps)
+            tables.append(envelope(connection, table, field_output.components_names, names, name=name))
+        return tables
 
-                    field_name = field_output.field_name
-                    problem_path = field_output.problem.path
+    @contextmanager
+    def _reading_with(self, executor):
+        """Context manager parsing the files with the results of OpenSees
+        in an executor (e.g. a :class:`concurrent.futures.ProcessPoolExecutor`)
+        while the results are extracted.
 
-                    results = []
-                    with open(os.path.join(problem_path, f"{field_name}.out"), "r") as f:
-                        lines = f.readlines()
-                        for line in lines:
-                            columns = line.split()
-
-                            key = int(columns[0])  # Convert the first column to int
-                            member = getattr(model, field_output.results_func)(key)[0]
-
-                            values = list(map(lambda x: round(float(x), 6), columns[1:]))
-                            if not values:
-                                continue
-
-                            # NOTE: OpenSees outputs the stresses at the integration points,
-                            # so we need to average them to get the element stresses
-                            if field_name == "s2d":
-                                num_integration_points = 4
-                                num_columns = len(values) // num_integration_points
-                                reshaped_data = np.array(values).reshape((num_integration_points, num_columns))
-                                averages = np.mean(reshaped_data, axis=0)
-                                values = averages.tolist()
-                                # NOTE: The OpenSees output is generalised stress,
-                                # so we need to convert it to True stress
-                                t = member.section.t
-                                true_stresses = {
-                                    "sigma_11": values[0] / t,
-                                    "sigma_22": values[1] / t,
-                                    "tau_12": values[2] / t,
-                                    "sigma_b11": 6 * values[3] / t**2,
-                                    "sigma_b22": 6 * values[4] / t**2,
-                                    "sigma_b12": 6 * values[5] / t**2,
-                                    "tau_q1": values[6] / (t * 5 / 6),  # Assuming shear area = 5/6 * t
-                                    "tau_q2": values[7] / (t * 5 / 6),
-                                }
-                                values = list(true_stresses.values())
-
-                            if len(values) < len(field_output.components_names):
-                                values = values + [0.0] * (len(field_output.components_names) - len(values))
-                            elif len(values) > len(field_output.components_names):
-                                values = values[: len(field_output.components_names)]
-                            else:
-                                values = values
-
-                            results.append([member.key] + [step.name, member.part.name] + values)
-
-                    rdb.create_table_for_output_class(field_output, results)
-
-            print("Results extraction completed!")
+        Parameters
+        ----------
+        executor : :class:`concurrent.futures.Executor`
+            The executor, ``None`` to parse the files in the current thread.
+        """
+        self._reader = executor
+        try:
+            yield
+        finally:
+            self._reader = None
+
+    @contextmanager
+    def _loading_results(self):
+        """Context manager wrapping the loading of the results of all the
+        steps in the results database.
+
+        The index of the members of the model is built only once and shared by
+        all the fields and steps. If `fast_db_load` is set, the
+        ``FAST_LOAD_PRAGMAS`` are applied to the database, and its previous
+        settings are restored afterwards.
+        """
+        self._members_index = None
+        if not self.fast_db_load:
+            try:
+                yield
+            finally:
+                self._members_index = None
+            return
+        connection = self.rdb.connection
+        previous = {pragma: connection.execute(f"PRAGMA {pragma}").fetchone()[0] for pragma in FAST_LOAD_PRAGMAS}
+        for pragma, value in FAST_LOAD_PRAGMAS.items():
+            connection.execute(f"PRAGMA {pragma}={value}")
+        try:
+            yield
+        finally:
+            # leaving the WAL mode also merges the WAL file into the database
+            connection.commit()
+            for pragma, value in previous.items():
+                connection.execute(f"PRAGMA {pragma}={value}")
+            self._members_index = None
+
+    def _find_members(self, output_type, keys, results_func=None, group=None):
+        """Find the members of the model with the given keys.
+
+        The first call builds a dictionary mapping the key of each node and
+        element of the model to the member and the name of its part, which is
+        reused until the results are loaded.
+
+        Parameters
+        ----------
+        output_type : str
+            Type of the members, either ``"node"`` or ``"element"``.
+        keys : iterable
+            The keys of the members.
+        results_func : str, optional
+            Name of the method of the model used to find the members missing
+            from the index (e.g. connectors), by default ``find_node_by_key``
+            or ``find_element_by_key``.
+        group : :class:`compas_fea2.model.NodesGroup` | :class:`compas_fea2.model.ElementsGroup`, optional
+            Group containing all the members. If given, the index is built only
+            for the members of the group.
+
+        Returns
+        -------
+        list
+            Pairs of member and name of its part, one per key.
+        """
+        if group is not None:
+            index = {member.key: (member, member.part.name) for member in (group.nodes if output_type == "node" else group.elements)}
+        else:
+            if self._members_index is None:
+                self._members_index = {"node": {}, "element": {}}
+                for part in self.model.parts:
+                    self._members_index["node"].update((node.key, (node, part.name)) for node in part.nodes)
+                    self._members_index["element"].update((element.key, (element, part.name)) for element in part.elements)
+            index = self._members_index[output_type]
+        find = getattr(self.model, results_func or f"find_{output_type}_by_key")
+
+        members = []
+        for key in keys:
+            member = index.get(key)
+            if member is None:
+                member = find(key)[0]
+                member = index[key] = (member, member.part.name)
+            members.append(member)
+        return members
+
+    def _store_modal_results(self, step, eigenvalues, eigenvectors):
+        """Store the results of a modal analysis in the results database.
+
+        All the rows are inserted with a single prepared statement per table,
+        inside one transaction.
+
+        Parameters
+        ----------
+        step : :class:`compas_fea2_opensees.problem.OpenseesModalAnalysis`
+            The modal analysis step.
+        eigenvalues : list
+            One row per mode with: mode, lambda, omega, frequency, period.
+        eigenvectors : list
+            One row per mode and node with: mode, node key (the tag of the
+            renumbered node) and the components of the eigenvector.
+
+        Returns
+        -------
+        None
+
+        """
+        components = ["x", "y", "z", "xx", "yy", "zz"]
+
+        eigenvectors = [list(eigenvector) for eigenvector in eigenvectors]
+        keys = self._node_keys([int(eigenvector[1]) for eigenvector in eigenvectors]).tolist()
+        nodes = self._find_members("node", keys)
+        rows = []
+        for eigenvector, (node, part_name) in zip(eigenvectors, nodes):
+            if len(eigenvector) < 8:
+                eigenvector = eigenvector + [0.0] * (8 - len(eigenvector))
+            rows.append([eigenvector[0], step.name, part_name, node.key] + eigenvector[2:])
+
+        columns = ",\n".join([f"{c} REAL" for c in components])
+        with self.rdb.connection as connection:
+            cursor = connection.cursor()
+
+            # Create table for eigenvalues
+            cursor.execute(
+                """
+            CREATE TABLE IF NOT EXISTS eigenvalues (
+                id INTEGER PRIMARY KEY,
+                step TEXT,
+                mode INTEGER,
+                lambda REAL,
+                omega REAL,
+                freq REAL,
+                period REAL
+                )
+            """
+            )
+            # Insert eigenvalues into the database
+            cursor.executemany(
+                """
+            INSERT INTO eigenvalues (step, mode, lambda, omega, freq, period)
+            VALUES (?, ?, ?, ?, ?, ?)
+            """,
+                ([step.name] + list(eigenvalue) for eigenvalue in eigenvalues),
+            )
+
+            # Create table for modal shapes
+            cursor.execute(
+                f"""
+            CREATE TABLE IF NOT EXISTS eigenvectors (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                mode INTEGER,
+                step TEXT,
+                part TEXT,
+                key INTEGER,
+                {columns}
+                )
+            """
+            )
+            # Insert modal shape data into the database
+            cursor.executemany(
+                f"""
+            INSERT INTO eigenvectors (mode, step, part, key, {", ".join(components)})
+            VALUES (?, ?, ?, ?, ?, ? ,?, ?, ?, ?)
+            """,
+                rows,
+            )
+
+    def _store_field_results(self, step, field_output, keys, values, step_name=None):
+        """Store the results of a field output in the results database.
+
+        Parameters
+        ----------
+        step : :class:`compas_fea2.problem._Step`
+            The step of the results.
+        field_output : :class:`compas_fea2.results.FieldResults`
+            The field output.
+        keys : numpy.ndarray
+            Keys of the members (nodes or elements), one per row of `values`,
+            as written by OpenSees (the tags of the renumbered nodes).
+        values : numpy.ndarray
+            2D array with the values returned by OpenSees for each member.
+            The missing values of the members with fewer values than the
+            others are ``nan``.
+        step_name : str, optional
+            Name under which the results are stored, by default the name of
+            the step.
+
+        Returns
+        -------
+        None
+
+        """
+        field_name = field_output.field_name
+        n_components = len(field_output.components_names)
+
+        values = np.asarray(values, dtype=float)
+        counts = np.count_nonzero(~np.isnan(values), axis=1)
+        # skip the members without results
+        keys, values, counts = keys[counts > 0], values[counts > 0], counts[counts > 0]
+        if field_output.output_type == "node":
+            keys = self._node_keys(keys)
+        members = self._find_members(field_output.output_type, keys.tolist(), field_output.results_func, getattr(field_output, "group", None))
+
+        # NOTE: OpenSees outputs the stresses at the integration points,
+        # so we need to average them to get the element stresses
+        if field_name == "s2d":
+            thicknesses = np.array([member.section.t for member, _ in members], dtype=float)
+            values = shell_stresses(values, counts, thicknesses)
+
+        # pad or truncate the values to the number of components of the field
+        values = np.nan_to_num(values[:, :n_components], nan=0.0)
+        if values.shape[1] < n_components:
+            values = np.pad(values, ((0, 0), (0, n_components - values.shape[1])))
+
+        step_name = step_name or step.name
+        results = [[member.key, step_name, part_name] + row for (member, part_name), row in zip(members, values.tolist())]
+        self.rdb.create_table_for_output_class(field_output, results)
@@ -19,4 +19,5 @@ from .quasistatic import (
 from .static import (
     OpenseesStaticStep,
     OpenseesStaticRiksStep,
+    IncrementReport,
 )
@@ -1,7 +1,52 @@
+import os
+import textwrap
+from collections import namedtuple
 
 from compas_fea2.problem.steps import StaticRiksStep
 from compas_fea2.problem.steps import StaticStep
 
+from compas_fea2_opensees.model.materials.material import OpenseesElasticIsotropic
+from compas_fea2_opensees.model.materials.material import OpenseesElasticOrthotropic
+from compas_fea2_opensees.model.materials.material import OpenseesStiff
+from compas_fea2_opensees.problem._systems import select_system
+
+# Materials with a symmetric (and constant) tangent stiffness
+SYMMETRIC_MATERIALS = (OpenseesElasticIsotropic, OpenseesElasticOrthotropic, OpenseesStiff)
+
+# Folder of the analysis with the checkpoints of the steps
+CHECKPOINTS_FOLDER = "checkpoints"
+
+# Algorithms tried, after the one of the step, when an adaptive increment
+# does not converge
+FALLBACK_ALGORITHMS = ("ModifiedNewton", "KrylovNewton", "NewtonLineSearch")
+# Factor reducing an adaptive increment that does not converge
+CUT_FACTOR = 0.5
+# Factor enlarging an adaptive increment after an easy convergence, i.e. in
+# at most EASY_ITERATIONS iterations with the algorithm of the step
+GROWTH_FACTOR = 2.0
+EASY_ITERATIONS = 3
+# Relative tolerance on the end time of the adaptive increments
+TIME_TOLERANCE = 1e-9
+
+IncrementReport = namedtuple("IncrementReport", ["increment", "time", "size", "iterations", "attempts", "algorithm"])
+IncrementReport.__doc__ = """Report of a converged increment of a step with adaptive increments.
+
+Attributes
+----------
+increment : int
+    Number of the increment, from 1.
+time : float
+    Time of the domain at the end of the increment.
+size : float
+    Size of the increment.
+iterations : int
+    Number of iterations of the convergence test.
+attempts : int
+    Number of algorithms that failed to converge before the one that did.
+algorithm : str
+    The algorithm that converged.
+"""
+
 
 class OpenseesStaticStep(StaticStep):
     """
@@ -34,6 +79,13 @@ class OpenseesStaticStep(StaticStep):
         - "ProfileSPD": Profile solver for symmetric positive definite matrices, suitable for specific problems.
         - "SuperLU": Direct solver using SuperLU, suitable for large sparse systems.
         - "UmfPack": Direct solver using UMFPACK, suitable for large sparse systems.
+        - "auto": Select the system and the numberer with the lowest estimated
+          memory for the model, from its number of degrees of freedom, the
+          bandwidth of its connectivity and the symmetry of its stiffness
+          (see :attr:`system_choice`). The choice is recorded in the header of
+          the input file.
+        When the problem is analysed with many processes, ``Mumps`` is
+        always used, with the ``ParallelPlain`` numberer.
     test : str, optional
         Convergence test (default is "NormDispIncr 1.0e-6, 10").
         Possible values:
@@ -68,6 +120,34 @@ class OpenseesStaticStep(StaticStep):
         - "PeriodicNewton": Periodic Newton-Raphson method, suitable for periodic problems.
     name : str, optional
         Name of the step.
+    multi_case : bool, optional
+        Solve each load case of the step separately, in the same OpenSees run
+        (default is False). Each case is applied with its own pattern, solved,
+        recorded, and then the pattern is removed and the domain is reset. The
+        ``Linear -factorOnce`` algorithm is used, so that the stiffness matrix
+        is assembled and factorised only once for all the cases. The results of
+        each case are stored under the name returned by :meth:`case_name`.
+    restart : int, optional
+        Number of increments between the checkpoints of the step (default is
+        False, no checkpoints). The increments are analysed in chunks and the
+        state of the domain is saved with ``database File`` and ``save`` after
+        each chunk, in the folder ``checkpoints`` of the analysis. An
+        interrupted analysis continues from the last checkpoint with
+        :meth:`OpenseesProblem.resume`. Not used by multi-case steps.
+    adaptive : bool, optional
+        Adapt the size of the increments to the convergence of the analysis
+        (default is False). The step is analysed up to its `time` with the
+        ``LoadControl`` integrator, starting with increments of
+        `initial_inc_size`. When an increment does not converge, the
+        ``ModifiedNewton``, ``KrylovNewton`` and ``NewtonLineSearch``
+        algorithms are tried after the one of the step, and then the
+        increment is halved, down to `min_inc_size`. The loads of the step
+        follow a linear time series, reaching their full value at `time`. After an easy
+        convergence the increment is doubled again, up to `initial_inc_size`.
+        At most `max_increments` increments are analysed. The iterations of
+        each increment are reported in a file of the analysis folder, read by
+        :meth:`read_increments`. With `restart`, a checkpoint is saved every
+        `restart` increments.
     """
 
     __doc__ += StaticStep.__doc__
@@ -88,11 +168,13 @@ class OpenseesStaticStep(StaticStep):
         nlgeom=False,
         modify=True,
         algorithm="Newton",
+        multi_case=False,
+        adaptive=False,
         **kwargs,
     ):
         super(OpenseesStaticStep, self).__init__(max_increments=max_increments, 
                                                  initial_inc_size=initial_inc_size, 
-                                                 max_inc_size=min_inc_size, 
+                                                 min_inc_size=min_inc_size, 
                                                  time=time, nlgeom=nlgeom, modify=modify, **kwargs)
         self.constraint = constraint
         self.algorithm = algorithm
@@ -101,8 +183,94 @@ class OpenseesStaticStep(StaticStep):
         self.test = test
         self.integrator = integrator
         self.analysis = analysis
+        self.multi_case = multi_case
+        self.adaptive = adaptive
+
+    @property
+    def cases(self):
+        """list : The load cases of the step, in the order in which they are
+        solved when `multi_case` is ``True``."""
+        return sorted({pattern.load_case for pattern in self.patterns}, key=str)
+
+    @property
+    def symmetric(self):
+        """bool : Whether the stiffness matrix of the step is symmetric: the
+        geometry is linear, the constraints are not enforced with Lagrange
+        multipliers and all the materials are linear elastic."""
+        if self.nlgeom or self.constraint == "Lagrange":
+            return False
+        return all(type(material) in SYMMETRIC_MATERIALS and not getattr(material, "notension", False) for material in self.problem.model.materials)
+
+    @property
+    def system_choice(self):
+        """:class:`compas_fea2_opensees.problem._systems.SystemChoice` : The
+        system of equations and the numberer selected when `system` is
+        ``"auto"``, ``None`` otherwise."""
+        if self.system != "auto":
+            return None
+        model = self.problem.model
+        parallel = bool(getattr(self.problem, "processes", None))
+        signature = (model._signature(), self.symmetric, parallel)
+        if getattr(self, "_system_choice", (None, None))[0] != signature:
+            self._system_choice = (signature, select_system(model, symmetric=self.symmetric, parallel=parallel))
+        return self._system_choice[1]
+
+    @property
+    def checkpoint_path(self):
+        """str : Path of the checkpoints of the step, relative to the analysis
+        folder, without extension. The saved states are in the OpenSees
+        database with this name and the number of the last checkpoint is in
+        the ``.txt`` file."""
+        return f"{CHECKPOINTS_FOLDER}/step{self.problem._steps_order.index(self)}"
+
+    @property
+    def increments_path(self):
+        """str : Path of the report of the adaptive increments of the step,
+        relative to the analysis folder."""
+        return f"step{self.problem._steps_order.index(self)}-increments.out"
+
+    def case_name(self, load_case):
+        """Name under which the results of a load case are stored when
+        `multi_case` is ``True``.
+
+        Parameters
+        ----------
+        load_case : str
+            The load case.
+
+        Returns
+        -------
+        str
+        """
+        return f"{self.name}/{load_case}"
+
+    def case_node_load(self, load_case):
+        """Nodes and total loads of a load case.
+
+        Parameters
+        ----------
+        load_case : str
+            The load case.
+
+        Returns
+        -------
+        list
+            Pairs of node and the sum of the loads applied to it by the
+            patterns of the load case.
+        """
+        nodes_loads = {}
+        for pattern in self.patterns:
+            if pattern.load_case == load_case:
+                for node, load in pattern.node_load:
+                    if node in nodes_loads:
+                        nodes_loads[node] += load
+                    else:
+                        nodes_loads[node] = load
+        return list(nodes_loads.items())
 
     def jobdata(self):
+        if self.multi_case:
+            return self._generate_multi_case_jobdata()
         return f"""#
 {self._generate_header_section()}
 # - Displacements
@@ -121,13 +289,7 @@ class OpenseesStaticStep(StaticStep):
 # - Analysis Parameters
 #   -------------------
 #
-constraints {self.constraint}
-numberer {self.numberer}
-system {self.system}
-test {self.test}
-algorithm {self.algorithm}
-integrator {self.integrator} {self.time}
-analysis {self.analysis}
+{self._generate_analysis_section()}
 
 # create a dummy Recorder for the reactions (Limitation of OpenSees)
 recorder Node -file dummy.out -node 0 -dof 1 reaction
@@ -136,7 +298,7 @@ recorder Element -xml strain.xml -eleRange 1 1 strains
 recorder Element -xml deformation.xml -eleRange 1 1 deformations
 
 
-analyze {self.max_increments}
+{self._generate_increments_section()}
 loadConst -time 0.0
 #
 # - Output Results
@@ -145,11 +307,190 @@ loadConst -time 0.0
 #
 """
 
+    def _generate_multi_case_jobdata(self):
+        data = [
+            f"""#
+{self._generate_header_section()}
+# - Displacements
+#   -------------
+{self._generate_displacements_section()}
+#
+# - Analysis Parameters
+#   -------------------
+#
+{self._generate_analysis_section(algorithm="Linear -factorOnce")}
+#"""
+        ]
+        for index, load_case in enumerate(self.cases):
+            data.append(
+                f"""#
+# - Load case {load_case}
+#   -----------{"-" * len(str(load_case))}
+{self._generate_case_loads_section(index, load_case)}
+analyze {self.max_increments}
+reactions
+{self._generate_output_section(suffix=f"_{index}")}
+#
+remove loadPattern {index + 1}
+reset
+#"""
+            )
+        return "\n".join(data) + "\n"
+
+    def _generate_case_loads_section(self, index, load_case):
+        loads = "\n".join([load.jobdata(node) for node, load in self.problem._local_node_load(self.case_node_load(load_case))])
+        return f"pattern Plain {index + 1} {self.problem._steps_order.index(self)} -fact 1 {{\n{loads}\n}}"
+
+    def _generate_increments_section(self):
+        if self.adaptive:
+            return self._generate_adaptive_section()
+        if not self.restart:
+            return f"analyze {self.max_increments}"
+        size = int(self.restart)
+        chunks = -(-self.max_increments // size)
+        last = self.max_increments - (chunks - 1) * size
+        restore, save = self._generate_checkpoint_sections()
+        return f"""# checkpoint every {size} increments
+{restore}
+while {{$checkpoint < {chunks}}} {{
+    set increments {size}
+    if {{$checkpoint == {chunks - 1}}} {{
+        set increments {last}
+    }}
+    if {{[analyze $increments] != 0}} {{
+        puts "error in step {self.name}: no convergence after checkpoint $checkpoint"
+        exit 1
+    }}
+    incr checkpoint
+{textwrap.indent(save, " " * 4)}
+}}"""
+
+    def _generate_checkpoint_sections(self, variables=()):
+        """Tcl code restoring the last checkpoint of the step, if any, and
+        saving a new one.
+
+        Parameters
+        ----------
+        variables : tuple, optional
+            Names of the Tcl variables saved with the number of the checkpoint
+            and restored with it.
+
+        Returns
+        -------
+        tuple
+            The code restoring the checkpoint, which sets the variable
+            ``checkpoint`` to its number (0 if there are none), and the code
+            saving the checkpoint ``$checkpoint``.
+        """
+        path = self.checkpoint_path
+        names = "".join(f" {name}" for name in variables)
+        values = "".join(f" ${name}" for name in variables)
+        # the number of the last checkpoint is replaced only once it is saved
+        restore = f"""file mkdir "{CHECKPOINTS_FOLDER}"
+database File "{path}"
+set checkpoint 0
+if {{[file exists "{path}.txt"]}} {{
+    set checkpoint_file [open "{path}.txt" r]
+    lassign [gets $checkpoint_file] checkpoint{names}
+    close $checkpoint_file
+    restore $checkpoint
+    puts "Step {self.name} restored from checkpoint $checkpoint"
+}}"""
+        save = f"""save $checkpoint
+set checkpoint_file [open "{path}.tmp" w]
+puts $checkpoint_file [list $checkpoint{values}]
+close $checkpoint_file
+file rename -force "{path}.tmp" "{path}.txt\""""
+        return restore, save
+
+    def _generate_adaptive_section(self):
+        if self.integrator != "LoadControl":
+            raise ValueError(f"The adaptive increments of step {self.name} require the LoadControl integrator.")
+        algorithms = " ".join(f"{{{algorithm}}}" for algorithm in dict.fromkeys([self.algorithm] + list(FALLBACK_ALGORITHMS)))
+        end = float(self.time)
+        if self.restart:
+            restore, save = self._generate_checkpoint_sections(variables=("increment", "time_step"))
+            restore = "\n" + restore
+            # the report of a resumed step is continued
+            report_mode = '[expr {$checkpoint ? "a" : "w"}]'
+            save = f"""
+    if {{$increment % {int(self.restart)} == 0}} {{
+        incr checkpoint
+{textwrap.indent(save, " " * 8)}
+    }}"""
+        else:
+            restore, save, report_mode = "", "", "w"
+        return f"""# adaptive increments
+set time_start [getTime]
+set increment 0
+set time_step {float(self.initial_inc_size)}{restore}
+set report [open "{self.increments_path}" {report_mode}]
+while {{{end} - ([getTime] - $time_start) > {end * TIME_TOLERANCE}}} {{
+    if {{$increment >= {self.max_increments}}} {{
+        puts "error in step {self.name}: maximum number of increments reached at time [getTime]"
+        exit 1
+    }}
+    set size [expr {{min($time_step, {end} - ([getTime] - $time_start))}}]
+    integrator LoadControl $size
+    set attempts 0
+    foreach algorithm [list {algorithms}] {{
+        algorithm {{*}}$algorithm
+        set ok [analyze 1]
+        if {{$ok == 0}} {{
+            break
+        }}
+        incr attempts
+    }}
+    if {{$ok != 0}} {{
+        # cut the increment and retry
+        set time_step [expr {{$size * {CUT_FACTOR}}}]
+        if {{$time_step < {float(self.min_inc_size)}}} {{
+            puts "error in step {self.name}: no convergence with the minimum increment at time [getTime]"
+            exit 1
+        }}
+        continue
+    }}
+    incr increment
+    set iterations [testIter]
+    puts $report "$increment [getTime] $size $iterations $attempts $algorithm"
+    flush $report
+    if {{$attempts == 0 && $iterations <= {EASY_ITERATIONS}}} {{
+        # grow the increment after an easy convergence
+        set time_step [expr {{min($size * {GROWTH_FACTOR}, {float(self.initial_inc_size)})}}]
+    }}{save}
+}}
+close $report
+algorithm {self.algorithm}"""
+
+    def read_increments(self):
+        """Read the report of the adaptive increments of the step from the
+        analysis folder.
+
+        Returns
+        -------
+        list[:class:`IncrementReport`]
+            The report of each converged increment, in order.
+        """
+        increments = {}
+        with open(os.path.join(self.problem.path, self.increments_path), "r") as f:
+            for line in f:
+                number, time, size, iterations, attempts, algorithm = line.split(" ", 5)
+                # the increments after the last checkpoint of a resumed step are repeated
+                increments[int(number)] = IncrementReport(int(number), float(time), float(size), int(iterations), int(attempts), algorithm.strip())
+        return [increments[number] for number in sorted(increments)]
+
     def _generate_header_section(self):
+        index = self.problem._steps_order.index(self)
+        if self.adaptive:
+            # the load is ramped up to the time of the step, so that cutting the
+            # increment also cuts the load increment
+            series = f"timeSeries Linear {index} -factor {1 / float(self.time)}"
+        else:
+            series = f"timeSeries Constant {index} -factor 1.0"
         return f"""#
 # STEP {self.name}
 #
-timeSeries Constant {self.problem._steps_order.index(self)} -factor 1.0
+{series}
 #"""
 
     def _generate_displacements_section(self):
@@ -160,7 +501,7 @@ timeSeries Constant {self.problem._steps_order.index(self)} -factor 1.0
         
         factor = 1
         index = 0
-        loads = "\n".join([load.jobdata(node) for node, load in self.combination.node_load])
+        loads = "\n".join([load.jobdata(node) for node, load in self.problem._local_node_load(self.combination.node_load)])
 
         return f"pattern Plain {index} {index} -fact {factor} {{\n{loads}\n}}" if loads else "#"
         
@@ -172,11 +513,28 @@ timeSeries Constant {self.problem._steps_order.index(self)} -factor 1.0
     def _generate_fields_section(self):
         return "#"
 
-    def _generate_output_section(self):
+    def _generate_analysis_section(self, algorithm=None):
+        choice = self.system_choice
+        if choice:
+            numberer, system = choice.numberer, choice.system
+        elif getattr(self.problem, "processes", None):
+            # the equations are distributed among the processes
+            numberer, system = "ParallelPlain", "Mumps"
+        else:
+            numberer, system = self.numberer, self.system
+        return f"""constraints {self.constraint}
+numberer {numberer}
+system {system}
+test {self.test}
+algorithm {algorithm or self.algorithm}
+integrator {self.integrator} {self.time}
+analysis {self.analysis}"""
+
+    def _generate_output_section(self, suffix=""):
         data_section = ["#"]
         if self._field_outputs:
             for foutput in self._field_outputs:
-                data_section.append(foutput.jobdata())
+                data_section.append(foutput.jobdata(foutput.field_name + suffix) if suffix else foutput.jobdata())
         if self._history_outputs:
             for houtput in self._history_outputs:
                 data_section.append(houtput.jobdata())
@@ -22,6 +22,9 @@ from .fields import (  # noqa: F401 F403
     OpenseesStressFieldResults,
     OpenseesContactFieldResults,
 )
+from .superposition import superpose
+from .envelopes import envelope
+from .envelopes import read_envelope
 
 
 __all__ = [
@@ -30,4 +33,7 @@ __all__ = [
     "OpenseesSectionForcesFieldResults",
     "OpenseesStressFieldResults",
     "OpenseesContactFieldResults",
+    "superpose",
+    "envelope",
+    "read_envelope",
 ]
@@ -0,0 +1,186 @@
+"""Envelopes of the results of many steps, load cases or combinations.
+
+For each member and component, the envelope stores the minimum, the maximum
+and the value with the largest magnitude among the selected steps, together
+with the step governing each of them. The results are reduced in chunks of
+members, so that the memory used does not depend on the size of the model.
+"""
+
+import numpy as np
+
+from compas_fea2_opensees.utilities import RESULTS_CHUNK_SIZE
+from compas_fea2_opensees.utilities import quote_identifier
+
+# Kinds of envelope stored for each member and component
+ENVELOPE_KINDS = ("min", "max", "absmax")
+
+
+def envelope_table(table):
+    """Name of the table with the envelopes of a results table.
+
+    Parameters
+    ----------
+    table : str
+        Name of the results table (the name of the field).
+
+    Returns
+    -------
+    str
+    """
+    return f"{table}_envelope"
+
+
+def reduce_envelope(results):
+    """Compute the envelope of the results of some steps.
+
+    Parameters
+    ----------
+    results : numpy.ndarray
+        Array ``(n_steps, n_members, n_components)`` with the results of each
+        step. The results missing from a step are ``nan``.
+
+    Returns
+    -------
+    dict
+        For each of ``"min"``, ``"max"`` and ``"absmax"``, a pair of arrays
+        ``(n_members, n_components)`` with the values and the index of the
+        governing step.
+    """
+    missing = np.isnan(results)
+    envelope = {}
+    # the missing results never govern
+    for kind, data, reduce in (
+        ("min", np.where(missing, np.inf, results), np.argmin),
+        ("max", np.where(missing, -np.inf, results), np.argmax),
+        ("absmax", np.where(missing, -1.0, np.abs(results)), np.argmax),
+    ):
+        index = reduce(data, axis=0)
+        envelope[kind] = (np.take_along_axis(results, index[None], axis=0)[0], index)
+    return envelope
+
+
+def envelope(connection, table, components, steps, name="envelope"):
+    """Compute the envelope of the results of some steps and store it in the
+    envelope table of the results table.
+
+    The envelope table has one row per member and component, with the
+    minimum, maximum and largest-magnitude values and their governing steps.
+    The envelope previously stored with the same name is replaced.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection`
+        Connection to the results database.
+    table : str
+        Name of the results table (the name of the field).
+    components : list[str]
+        Names of the columns of the components of the results.
+    steps : list[str]
+        Names of the steps, load cases or combinations (``step`` column) to
+        include in the envelope.
+    name : str, optional
+        Name of the envelope, by default ``"envelope"``.
+
+    Returns
+    -------
+    str
+        Name of the envelope table.
+    """
+    steps = list(steps)
+    target = envelope_table(table)
+    step_index = {step: i for i, step in enumerate(steps)}
+    columns = ", ".join(quote_identifier(c) for c in components)
+    placeholders = ", ".join("?" * len(steps))
+
+    with connection:
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {quote_identifier(table + '_step_key')} ON {quote_identifier(table)} (step, key)")
+        connection.execute(
+            f"""
+        CREATE TABLE IF NOT EXISTS {quote_identifier(target)} (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            envelope TEXT,
+            key INTEGER,
+            part TEXT,
+            component TEXT,
+            min REAL,
+            min_step TEXT,
+            max REAL,
+            max_step TEXT,
+            absmax REAL,
+            absmax_step TEXT
+            )
+        """
+        )
+        connection.execute(f"CREATE INDEX IF NOT EXISTS {quote_identifier(target + '_envelope_key')} ON {quote_identifier(target)} (envelope, key)")
+        connection.execute(f"DELETE FROM {quote_identifier(target)} WHERE envelope = ?", (name,))
+        if not steps:
+            return target
+
+        query = f"SELECT DISTINCT key FROM {quote_identifier(table)} WHERE step IN ({placeholders}) ORDER BY key"
+        keys = np.array([row[0] for row in connection.execute(query, steps)], dtype=np.int64)
+        chunk = max(RESULTS_CHUNK_SIZE // (len(steps) * len(components)), 1)
+        names = np.array(steps, dtype=object)
+        insert = (
+            f"INSERT INTO {quote_identifier(target)} (envelope, key, part, component, min, min_step, max, max_step, absmax, absmax_step) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)"
+        )
+        for start in range(0, len(keys), chunk):
+            members = keys[start : start + chunk]
+            rows = connection.execute(
+                f"SELECT step, key, part, {columns} FROM {quote_identifier(table)} WHERE step IN ({placeholders}) AND key BETWEEN ? AND ?",
+                steps + [int(members[0]), int(members[-1])],
+            ).fetchall()
+            positions = np.searchsorted(members, np.array([row[1] for row in rows], dtype=np.int64))
+            results = np.full((len(steps), len(members), len(components)), np.nan)
+            results[np.array([step_index[row[0]] for row in rows]), positions] = np.array([row[3:] for row in rows], dtype=float)
+            parts = np.empty(len(members), dtype=object)
+            parts[positions] = [row[2] for row in rows]
+
+            reduced = reduce_envelope(results)
+            shape = results.shape[1:]
+            data = [
+                np.broadcast_to(members[:, None], shape),
+                np.broadcast_to(parts[:, None], shape),
+                np.broadcast_to(np.array(components, dtype=object), shape),
+            ]
+            for kind in ENVELOPE_KINDS:
+                values, index = reduced[kind]
+                data.extend([values, names[index]])
+            connection.executemany(insert, ((name,) + row for row in zip(*(column.ravel().tolist() for column in data))))
+    return target
+
+
+def read_envelope(connection, table, name="envelope", kind="absmax", keys=None):
+    """Read an envelope stored in the envelope table of a results table.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection`
+        Connection to the results database.
+    table : str
+        Name of the results table (the name of the field).
+    name : str, optional
+        Name of the envelope, by default ``"envelope"``.
+    kind : str, optional
+        One of ``"min"``, ``"max"`` or ``"absmax"``, by default ``"absmax"``.
+    keys : list[int], optional
+        Keys of the members to read, by default all the members.
+
+    Returns
+    -------
+    dict
+        For each key, a dictionary with the value and the governing step of
+        each component, ``{component: (value, step)}``.
+    """
+    if kind not in ENVELOPE_KINDS:
+        raise ValueError(f"Unknown envelope kind {kind}: use one of {', '.join(ENVELOPE_KINDS)}.")
+    query = f"SELECT key, component, {kind}, {kind}_step FROM {quote_identifier(envelope_table(table))} WHERE envelope = ?"
+    parameters = [name]
+    if keys is not None:
+        keys = list(keys)
+        query += f" AND key IN ({', '.join('?' * len(keys))})"
+        parameters += keys
+    envelope = {}
+    for key, component, value, step in connection.execute(query, parameters):
+        envelope.setdefault(key, {})[component] = (value, step)
+    return envelope
@@ -5,10 +5,27 @@ from compas_fea2.results.fields import StressFieldResults
 from compas_fea2.results.fields import ContactForcesFieldResults
 
 
-def tcl_export_node_results(field_name, function_name):
+def tcl_tags(output_type, group=None, subdomain=None):
+    """Tcl list with the tags of the nodes or elements of a field output: all
+    the members of the model, or only those of a group.
+
+    In the input file of a rank of an OpenSeesMP analysis (`subdomain`), the
+    members of the group are limited to those of the subdomain, which are the
+    only ones defined by the rank.
+    """
+    if group is None:
+        return "[getNodeTags]" if output_type == "node" else "[getEleTags]"
+    members = group.nodes if output_type == "node" else group.elements
+    if subdomain is not None:
+        defined = subdomain.nodes if output_type == "node" else subdomain.elements
+        members = [member for member in members if member in defined]
+    return "{" + " ".join(str(key) for key in sorted(member.key for member in members)) + "}"
+
+
+def tcl_export_node_results(field_name, function_name, tags="[getNodeTags]"):
     return f"""
 set {field_name}File [open "{field_name}.out" "w"]
-set allNodes [getNodeTags]
+set allNodes {tags}
 foreach nodeTag $allNodes {{
     set {field_name} [{function_name} $nodeTag]
     puts ${field_name}File "$nodeTag ${field_name}"
@@ -17,14 +34,50 @@ close ${field_name}File
 """
 
 
+def tcl_record_node_results(field_name, response, dofs, tags="[getNodeTags]"):
+    return f"""
+set {field_name}Tags {tags}
+set {field_name}TagsFile [open "{field_name}.tags" "w"]
+puts ${field_name}TagsFile ${field_name}Tags
+close ${field_name}TagsFile
+reactions
+if {{[llength ${field_name}Tags]}} {{
+    set {field_name}Recorder [recorder Node -binary "{field_name}.bin" -node {{*}}${field_name}Tags -dof {" ".join(str(dof) for dof in range(1, dofs + 1))} {response}]
+    record
+    remove recorder ${field_name}Recorder
+}}
+"""
+
+
+def tcl_export_element_results(field_name, response, tags="[getEleTags]"):
+    return f"""
+set {field_name}File [open "{field_name}.out" "w"]
+set allElements {tags}
+foreach eleTag $allElements {{
+    set {field_name} [eleResponse $eleTag {response}]
+    puts ${field_name}File "$eleTag ${field_name}"
+}}
+close ${field_name}File
+"""
+
+
+# Name of the responses of the node recorders
+RECORDER_RESPONSES = {"nodeDisp": "disp", "nodeReaction": "reaction"}
+
+
 class OpenseesDisplacementFieldResults(DisplacementFieldResults):
-    def __init__(self, step, *args, **kwargs):
+    def __init__(self, step, *args, group=None, **kwargs):
         super().__init__(step, *args, **kwargs)
+        self.group = group
         self.input_name = "U"
         self.output_type = "node"
+        self.response = "nodeDisp"
 
-    def jobdata(self):
-        return tcl_export_node_results(self.field_name, "nodeDisp")
+    def jobdata(self, name=None):
+        tags = tcl_tags(self.output_type, self.group, self.problem._subdomain)
+        if self.problem.output_format == "binary":
+            return tcl_record_node_results(name or self.field_name, RECORDER_RESPONSES[self.response], len(self.components_names), tags)
+        return tcl_export_node_results(name or self.field_name, self.response, tags)
 
 
 # class OpenseesAccelerationFieldResults(AccelerationFieldResults):
@@ -48,38 +101,50 @@ class OpenseesDisplacementFieldResults(DisplacementFieldResults):
 
 
 class OpenseesReactionFieldResults(ReactionFieldResults):
-    def __init__(self, step, *args, **kwargs):
+    def __init__(self, step, *args, group=None, **kwargs):
         super().__init__(step, *args, **kwargs)
+        self.group = group
         self.input_name = "RF"
         self.output_type = "node"
+        self.response = "nodeReaction"
 
-    def jobdata(self):
-        return tcl_export_node_results(self.field_name, "nodeReaction")
+    def jobdata(self, name=None):
+        tags = tcl_tags(self.output_type, self.group, self.problem._subdomain)
+        if self.problem.output_format == "binary":
+            return tcl_record_node_results(name or self.field_name, RECORDER_RESPONSES[self.response], len(self.components_names), tags)
+        return tcl_export_node_results(name or self.field_name, self.response, tags)
 
 
 class OpenseesSectionForcesFieldResults(SectionForcesFieldResults):
-    def __init__(self, step, *args, **kwargs):
+    def __init__(self, step, *args, group=None, **kwargs):
         super().__init__(step, *args, **kwargs)
+        self.group = group
         self.input_name = "SF"
         self.output_type = "element"
+        self.response = "force"
 
-    def jobdata(self):
-        return "SF"
+    def jobdata(self, name=None):
+        tags = tcl_tags(self.output_type, self.group, self.problem._subdomain)
+        return tcl_export_element_results(name or self.field_name, self.response, tags)
 
 
 class OpenseesStressFieldResults(StressFieldResults):
-    def __init__(self, step, *args, **kwargs):
+    def __init__(self, step, *args, group=None, **kwargs):
         super().__init__(step, *args, **kwargs)
+        self.group = group
         self.input_name = "S"
         self.output_type = "element"
+        self.response = "stresses"
 
-    def jobdata(self):
-        return "S"
+    def jobdata(self, name=None):
+        tags = tcl_tags(self.output_type, self.group, self.problem._subdomain)
+        return tcl_export_element_results(name or self.field_name, self.response, tags)
 
 
 class OpenseesContactFieldResults(ContactForcesFieldResults):
-    def __init__(self, step, *args, **kwargs):
+    def __init__(self, step, *args, group=None, **kwargs):
         super().__init__(step, *args, **kwargs)
+        self.group = group
         self.input_name = "CFORCE"
         self.output_type = "element"
 
@@ -0,0 +1,120 @@
+"""Linear superposition of the results of load cases.
+
+The results of a linear analysis under a combination of load cases are the
+combination of the results of the single cases with the same factors. The
+results of many combinations are therefore computed from the stored results of
+the cases as a single product between the matrix of the factors
+(combinations x cases) and the array of the results (cases x members x
+components), without running the analysis again.
+"""
+
+import numpy as np
+
+from compas_fea2_opensees.utilities import RESULTS_CHUNK_SIZE
+from compas_fea2_opensees.utilities import quote_identifier
+
+
+def read_cases(connection, table, components, cases):
+    """Read the results of some load cases from a table of the results database.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection`
+        Connection to the results database.
+    table : str
+        Name of the table (the name of the field).
+    components : list[str]
+        Names of the columns of the components of the results.
+    cases : list[str]
+        Names under which the results of the cases are stored (``step`` column).
+
+    Returns
+    -------
+    tuple
+        The keys and the part names of the members, and an array with shape
+        ``(n_cases, n_members, n_components)`` with their results. The results
+        of the members missing from a case are zero.
+    """
+    columns = ", ".join(quote_identifier(c) for c in components)
+    rows = connection.execute(
+        f"SELECT step, key, part, {columns} FROM {quote_identifier(table)} WHERE step IN ({', '.join('?' * len(cases))})",
+        list(cases),
+    ).fetchall()
+    if not rows:
+        return np.zeros(0, dtype=int), [], np.zeros((len(cases), 0, len(components)))
+
+    case_index = {case: i for i, case in enumerate(cases)}
+    steps = np.array([case_index[row[0]] for row in rows])
+    keys = np.array([row[1] for row in rows], dtype=np.int64)
+    values = np.array([row[3:] for row in rows], dtype=float)
+
+    members, first, positions = np.unique(keys, return_index=True, return_inverse=True)
+    parts = [rows[i][2] for i in first.tolist()]
+    results = np.zeros((len(cases), len(members), len(components)))
+    results[steps, positions] = np.nan_to_num(values)
+    return members, parts, results
+
+
+def combine(factors, results):
+    """Combine the results of the load cases.
+
+    Parameters
+    ----------
+    factors : array_like
+        Matrix ``(n_combinations, n_cases)`` of the factors of each case in
+        each combination.
+    results : numpy.ndarray
+        Array ``(n_cases, n_members, n_components)`` of the results of the cases.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array ``(n_combinations, n_members, n_components)`` of the results of
+        the combinations.
+    """
+    return np.tensordot(np.asarray(factors, dtype=float), results, axes=1)
+
+
+def superpose(connection, table, components, cases, factors, names):
+    """Compute the results of load combinations from the results of the load
+    cases and store them in the same table.
+
+    The combinations are processed in chunks, so that the memory used does
+    not depend on their number. The results previously stored under the same
+    names are replaced.
+
+    Parameters
+    ----------
+    connection : :class:`sqlite3.Connection`
+        Connection to the results database.
+    table : str
+        Name of the table (the name of the field).
+    components : list[str]
+        Names of the columns of the components of the results.
+    cases : list[str]
+        Names under which the results of the cases are stored.
+    factors : array_like
+        Matrix ``(n_combinations, n_cases)`` of the factors of each case in
+        each combination.
+    names : list[str]
+        Names under which the results of the combinations are stored.
+
+    Returns
+    -------
+    None
+    """
+    factors = np.asarray(factors, dtype=float).reshape(len(names), len(cases))
+    keys, parts, results = read_cases(connection, table, components, cases)
+    if not len(keys):
+        return
+
+    columns = ", ".join(quote_identifier(c) for c in components)
+    insert = f"INSERT INTO {quote_identifier(table)} (key, step, part, {columns}) VALUES (?, ?, ?, {', '.join('?' * len(components))})"
+    keys = keys.tolist()
+    chunk = max(RESULTS_CHUNK_SIZE // results[0].size, 1)
+    with connection:
+        connection.executemany(f"DELETE FROM {quote_identifier(table)} WHERE step = ?", [(name,) for name in names])
+        for start in range(0, len(names), chunk):
+            combined = combine(factors[start : start + chunk], results)
+            for name, values in zip(names[start : start + chunk], combined):
+                connection.executemany(insert, ([key, name, part] + row for key, part, row in zip(keys, parts, values.tolist())))
@@ -0,0 +1,30 @@
+"""
+********************************************************************************
+opensees.utilities
+********************************************************************************
+
+.. currentmodule:: compas_fea2_opensees.utilities
+
+
+"""
+
+from ._utils import WRITE_BUFFER_SIZE
+from ._utils import RESULTS_CHUNK_SIZE
+from ._utils import quote_identifier
+from ._utils import join_lines
+from ._utils import format_rows
+from ._utils import stack_rows
+from ._utils import read_table
+from ._utils import KeyOrderedIndex
+
+
+__all__ = [
+    "WRITE_BUFFER_SIZE",
+    "RESULTS_CHUNK_SIZE",
+    "quote_identifier",
+    "join_lines",
+    "format_rows",
+    "stack_rows",
+    "read_table",
+    "KeyOrderedIndex",
+]
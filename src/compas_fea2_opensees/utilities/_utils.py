@@ -0,0 +1,176 @@
+import warnings
+
+import numpy as np
+
+# Size of the write buffer of the generated files (bytes)
+WRITE_BUFFER_SIZE = 1 << 20
+
+# Maximum number of values of the results held in memory at once when they
+# are processed in the results database
+RESULTS_CHUNK_SIZE = 10000000
+
+
+def quote_identifier(name):
+    """Quote the name of a table or of a column of an SQLite database.
+
+    Parameters
+    ----------
+    name : str
+        The name.
+
+    Returns
+    -------
+    str
+    """
+    return '"{}"'.format(name.replace('"', '""'))
+
+
+def join_lines(lines, separator="\n"):
+    """Lazy equivalent of ``separator.join(lines)``.
+
+    Parameters
+    ----------
+    lines : iterable[str]
+        The lines to join. It can be a generator, in which case the lines are
+        produced only when requested.
+    separator : str, optional
+        String inserted between two consecutive lines, by default a new line.
+
+    Yields
+    ------
+    str
+        The lines and the separators, in order.
+    """
+    lines = iter(lines)
+    for line in lines:
+        yield line
+        break
+    for line in lines:
+        yield separator
+        yield line
+
+
+def format_rows(fmt, rows):
+    """Format all the rows of a table with the same printf-style template.
+
+    The template is repeated once per row and filled with the flattened table
+    in a single formatting call, which is much faster than formatting each row
+    separately.
+
+    Parameters
+    ----------
+    fmt : str
+        printf-style template of a single row (e.g. ``"node %d %15.8f"``).
+    rows : array_like
+        2D table with one row per line and one column per placeholder.
+
+    Returns
+    -------
+    str
+        The formatted lines, separated by new lines (without a trailing one).
+    """
+    rows = np.asarray(rows)
+    if not len(rows):
+        return ""
+    return "\n".join([fmt] * len(rows)) % tuple(rows.ravel().tolist())
+
+
+def stack_rows(rows, fill_value=np.nan):
+    """Stack rows of possibly different lengths into a 2D float array.
+
+    Parameters
+    ----------
+    rows : list
+        The rows to stack. Each row is a sequence of numbers, or of strings
+        representing numbers.
+    fill_value : float, optional
+        Value of the missing cells of the shorter rows, by default ``nan``.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array with one row per input row and as many columns as the longest
+        row.
+    """
+    table = np.full((len(rows), max(map(len, rows), default=0)), fill_value, dtype=float)
+    for i, row in enumerate(rows):
+        table[i, : len(row)] = row
+    return table
+
+
+def read_table(file_path):
+    """Read a whitespace-separated table of numbers, such as the .out files
+    written by OpenSees, into a 2D float array.
+
+    The whole file is parsed in a single call. Only if the rows do not have
+    the same number of columns, the file is parsed line by line and the
+    missing cells of the shorter rows are set to ``nan``.
+
+    Parameters
+    ----------
+    file_path : str
+        Path to the file.
+
+    Returns
+    -------
+    numpy.ndarray
+        Array with one row per line of the file.
+    """
+    try:
+        with warnings.catch_warnings():
+            # an empty file is a valid empty table
+            warnings.simplefilter("ignore", UserWarning)
+            return np.loadtxt(file_path, dtype=float, ndmin=2)
+    except ValueError:
+        with open(file_path, "r") as f:
+            return stack_rows([line.split() for line in f if line.strip()])
+
+
+class KeyOrderedIndex(object):
+    """Index of the members of a container (nodes, elements, connectors...)
+    that provides them sorted by key.
+
+    Members are appended when they are added to the container. Since the keys
+    usually follow the insertion order, the index is normally already sorted
+    and reading it only costs a linear check. Otherwise it is sorted once and
+    stays sorted until the keys change again.
+
+    """
+
+    def __init__(self):
+        self._members = []
+
+    def __len__(self):
+        return len(self._members)
+
+    def add(self, member):
+        """Add a member to the index.
+
+        Parameters
+        ----------
+        member : obj
+            Any object with a ``key`` attribute.
+        """
+        self._members.append(member)
+
+    def ordered(self, members):
+        """Return the members sorted by key.
+
+        Parameters
+        ----------
+        members : collection
+            All the members currently in the container. If the index is out of
+            sync with it (e.g. members added or removed bypassing the index),
+            the index is rebuilt from it.
+
+        Returns
+        -------
+        list
+            The members sorted by key.
+        """
+        if len(self._members) != len(members):
+            self._members = list(members)
+        keys = np.fromiter((member.key for member in self._members), dtype=np.int64, count=len(self._members))
+        if not (keys[1:] > keys[:-1]).all():
+            self._members = [self._members[i] for i in np.argsort(keys, kind="stable")]
+        return self._members
@@ -0,0 +1,53 @@
+import os
+import sys
+
+from compas_fea2_opensees.problem import AnalysisCache
+
+
+def _analyse(folder, name, date):
+    os.makedirs(folder, exist_ok=True)
+    with open(os.path.join(folder, f"{name}.tcl"), "w") as f:
+        f.write(f"# ------------------------\n# m\n# ------------------------\n# Date: {date}\n#\nnode 1 0.0 0.0 0.0\n")
+    with open(os.path.join(folder, f"{name}-results.db"), "wb") as f:
+        f.write(b"results")
+    return os.path.join(folder, f"{name}.tcl"), os.path.join(folder, f"{name}-results.db")
+
+
+def test_same_problem_hits_the_cache(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    first, database = _analyse(tmp_path / "first", "p", "01/01/2026 10:00:00")
+    key = cache.key(first, sys.executable)
+    assert not cache.restore(key, database)
+    cache.store(key, database)
+
+    second, database = _analyse(tmp_path / "second", "p", "01/01/2026 10:00:07")
+    os.remove(database)
+    assert cache.key(second, sys.executable) == key
+    assert cache.restore(key, database)
+    with open(database, "rb") as f:
+        assert f.read() == b"results"
+
+
+def test_problem_with_another_name_hits_the_cache(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    first, database = _analyse(tmp_path / "first", "OP_1", "01/01/2026 10:00:00")
+    cache.store(cache.key(first, sys.executable), database)
+
+    second, database = _analyse(tmp_path / "second", "OP_2", "01/01/2026 10:00:00")
+    os.remove(database)
+    assert cache.restore(cache.key(second, sys.executable), database)
+    # the results are restored to the database of the new problem
+    assert sorted(os.listdir(tmp_path / "second")) == ["OP_2-results.db", "OP_2.tcl"]
+    with open(database, "rb") as f:
+        assert f.read() == b"results"
+
+
+def test_changed_problem_misses_the_cache(tmp_path):
+    cache = AnalysisCache(tmp_path / "cache")
+    first, database = _analyse(tmp_path / "first", "p", "01/01/2026 10:00:00")
+    cache.store(cache.key(first, sys.executable), database)
+
+    second, database = _analyse(tmp_path / "second", "p", "01/01/2026 10:00:00")
+    with open(second, "a") as f:
+        f.write("node 2 1.0 0.0 0.0\n")
+    assert not cache.restore(cache.key(second, sys.executable), database)
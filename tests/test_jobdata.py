@@ -0,0 +1,100 @@
+from types import SimpleNamespace
+
+from compas_fea2_opensees.model import OpenseesBeamElement
+from compas_fea2_opensees.model import OpenseesNode
+from compas_fea2_opensees.model import OpenseesPart
+from compas_fea2_opensees.model import OpenseesShellElement
+from compas_fea2_opensees.model import OpenseesTrussElement
+
+
+def _nodes(n):
+    nodes = []
+    for i in range(n):
+        xyz = [1.5 * i - 100.0, -0.0 if i % 2 else 1 / 3, 1e3 / (i + 1)]
+        mass = (1.5, 2.0, 0.0, 0.0, 0.0, 0.0) if i % 3 == 0 else (0.0,) * 6
+        node = OpenseesNode(xyz=xyz, mass=mass)
+        node._key = i + 1
+        nodes.append(node)
+    return nodes
+
+
+def _section(key):
+    material = SimpleNamespace(key=key + 10, E=210e9, G=80e9)
+    return SimpleNamespace(key=key, A=0.01 * key, t=0.1 * key, J=1e-5, Ixx=1e-4, Iyy=2e-4, material=material, _shape=None)
+
+
+def _element(cls, key, nodes, section, **kwargs):
+    element = cls(nodes=nodes, section=section, **kwargs)
+    element._key = key
+    return element
+
+
+def test_nodes_batch_jobdata():
+    nodes = _nodes(50)
+    assert OpenseesNode.batch_jobdata(nodes) == "\n".join(node.jobdata() for node in nodes)
+
+
+def test_truss_batch_jobdata():
+    nodes = _nodes(21)
+    sections = [_section(1), _section(2)]
+    elements = [_element(OpenseesTrussElement, i + 1, nodes[i : i + 2], sections[i % 2]) for i in range(20)]
+    assert OpenseesTrussElement.batch_jobdata(elements) == "\n".join(element.jobdata() for element in elements)
+
+
+def test_shell_batch_jobdata():
+    nodes = _nodes(40)
+    sections = [_section(1), _section(2)]
+    elements = []
+    for i in range(0, 36, 4):
+        section = sections[i % 3 % 2]
+        elements.append(_element(OpenseesShellElement, i + 1, nodes[i : i + 3], section))
+        elements.append(_element(OpenseesShellElement, i + 2, nodes[i : i + 4], section))
+        elements.append(_element(OpenseesShellElement, i + 3, nodes[i : i + 3], section, implementation="tri31"))
+        elements.append(_element(OpenseesShellElement, i + 4, nodes[i : i + 4], section, implementation="fourNodeQuad"))
+    assert OpenseesShellElement.batch_jobdata(elements) == "\n".join(element.jobdata() for element in elements)
+
+
+class _Part(object):
+    """Stand-in part of the beams."""
+
+    ndm = 3
+
+
+def _beams(frames):
+    # beams along the x axis
+    part = _Part()
+    nodes = []
+    for i in range(len(frames) + 1):
+        node = OpenseesNode(xyz=[float(i), 0.0, 0.0], mass=(0.0,) * 6)
+        node._key = i + 1
+        node._registration = part
+        nodes.append(node)
+    section = _section(1)
+    return [_element(OpenseesBeamElement, i + 1, nodes[i : i + 2], section, frame=frame, transformation="Linear") for i, frame in enumerate(frames)]
+
+
+def test_beams_batch_jobdata():
+    beams = _beams([[0.0, 0.0, -1.0], [0.0, 1.0, 0.0], [0.0, 0.0, -1.0]])
+    assert all(beam.transformation == "Linear" for beam in beams)
+    # each beam defines its own transformation
+    data = OpenseesBeamElement.batch_jobdata(beams)
+    assert data == "\n".join(beam.jobdata() for beam in beams)
+    assert [line.split()[:3] for line in data.splitlines() if line.startswith("geomTransf")] == [["geomTransf", "Linear", str(beam.key)] for beam in beams]
+
+
+def test_beams_share_geom_transformations():
+    beams = _beams([[0.0, 0.0, -1.0], [0.0, 0.0, -1.0], [0.0, 1.0, 0.0], [0.0, 0.0, -1.0]])
+    geom_transformations = {}
+    data = OpenseesPart._assign_geom_transformations(beams, geom_transformations)
+    # one transformation per orientation
+    assert [line.split()[:3] for line in data.splitlines()] == [["geomTransf", "Linear", "1"], ["geomTransf", "Linear", "2"]]
+    assert [beam.transf_tag for beam in beams] == [1, 1, 2, 1]
+    assert len(geom_transformations) == 2
+
+    batch = OpenseesBeamElement.batch_jobdata(beams)
+    assert batch == "\n".join(beam.jobdata() for beam in beams)
+    assert "geomTransf" not in batch
+    assert [line.split()[-1] for line in batch.splitlines()] == ["1", "1", "2", "1"]
+
+    # the transformations already written are not written again
+    assert OpenseesPart._assign_geom_transformations(_beams([[0.0, 1.0, 0.0]]), geom_transformations) == ""
@@ -0,0 +1,24 @@
+from collections import Counter
+
+import pytest
+
+from compas_fea2_opensees.job.partitioner import graph_partition
+from compas_fea2_opensees.job.partitioner import subdomains
+
+
+@pytest.mark.parametrize("processes", [2, 3, 4, 7])
+@pytest.mark.parametrize("nx, ny", [(12, 9), (25, 12)])
+def test_graph_partition_balance(grid_model, processes, nx, ny):
+    model = grid_model(nx, ny)
+    element_ranks = graph_partition(model, processes)
+    assert set(element_ranks) == set(model.parts[0].elements)
+    sizes = Counter(element_ranks.values())
+    assert sorted(sizes) == list(range(processes))
+    assert max(sizes.values()) - min(sizes.values()) <= 1
+
+
+def test_graph_partition_subdomains(grid_model):
+    model = grid_model(12, 9)
+    domains = subdomains(model, graph_partition(model, 4), 4)
+    assert sum(len(domain.elements) for domain in domains) == 12 * 9
+    assert set().union(*(domain.nodes for domain in domains)) == set(model.parts[0].nodes)
@@ -0,0 +1,22 @@
+import numpy as np
+
+from compas_fea2_opensees.problem._renumbering import NodeRenumbering
+
+
+def test_renumbering_round_trip(grid_model):
+    model = grid_model(20, 6, shuffle=True)
+    nodes = model.parts[0].nodes
+    keys = {node: node.key for node in nodes}
+    renumbering = NodeRenumbering(model)
+
+    assert sorted(renumbering.tags.tolist()) == sorted(keys.values())
+    assert renumbering.bandwidth[1] < renumbering.bandwidth[0]
+    np.testing.assert_array_equal(renumbering.original_keys(renumbering.new_tags(renumbering.keys)), renumbering.keys)
+
+    with renumbering.applied():
+        assert model._renumbered
+        tags = {node: node.key for node in nodes}
+        np.testing.assert_array_equal(renumbering.new_tags([keys[node] for node in nodes]), [tags[node] for node in nodes])
+        np.testing.assert_array_equal(renumbering.original_keys([tags[node] for node in nodes]), [keys[node] for node in nodes])
+    assert not model._renumbered
+    assert {node: node.key for node in nodes} == keys
@@ -0,0 +1,110 @@
+import sqlite3
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from compas_fea2_opensees.job.partitioner import Subdomain
+from compas_fea2_opensees.problem.problem import read_binary_results
+from compas_fea2_opensees.problem.problem import shell_stresses
+from compas_fea2_opensees.results import envelope
+from compas_fea2_opensees.results import read_envelope
+from compas_fea2_opensees.results import superpose
+from compas_fea2_opensees.results.fields import tcl_tags
+
+CASES = {
+    "dead": {1: (1.0, -2.0), 2: (3.0, 0.5), 3: (-1.0, 4.0)},
+    "live": {1: (0.5, 1.0), 2: (-6.0, 0.0)},
+}
+
+
+@pytest.fixture
+def connection():
+    connection = sqlite3.connect(":memory:")
+    connection.execute("CREATE TABLE u (id INTEGER PRIMARY KEY, key INTEGER, step TEXT, part TEXT, x REAL, y REAL)")
+    for case, results in CASES.items():
+        connection.executemany("INSERT INTO u (key, step, part, x, y) VALUES (?, ?, 'p', ?, ?)", [(key, case, *values) for key, values in results.items()])
+    yield connection
+    connection.close()
+
+
+def _results(connection, step):
+    return {key: (x, y) for key, x, y in connection.execute("SELECT key, x, y FROM u WHERE step = ?", (step,))}
+
+
+def test_superpose(connection):
+    superpose(connection, "u", ["x", "y"], ["dead", "live"], [[1.35, 1.5], [1.0, 0.0]], ["uls", "sls"])
+    uls = _results(connection, "uls")
+    assert uls[1] == pytest.approx((1.35 * 1.0 + 1.5 * 0.5, 1.35 * -2.0 + 1.5 * 1.0))
+    assert uls[2] == pytest.approx((1.35 * 3.0 + 1.5 * -6.0, 1.35 * 0.5))
+    # the members missing from a case have no results in it
+    assert uls[3] == pytest.approx((1.35 * -1.0, 1.35 * 4.0))
+    assert _results(connection, "sls") == {key: pytest.approx(values) for key, values in CASES["dead"].items()}
+
+    # the combinations with the same name are replaced
+    superpose(connection, "u", ["x", "y"], ["dead", "live"], [[2.0, 0.0]], ["sls"])
+    assert _results(connection, "sls")[2] == pytest.approx((6.0, 1.0))
+    assert connection.execute("SELECT COUNT(*) FROM u WHERE step = 'sls'").fetchone()[0] == 3
+
+
+def test_envelope(connection):
+    table = envelope(connection, "u", ["x", "y"], ["dead", "live"])
+    assert connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0] == 6
+    assert read_envelope(connection, "u", kind="min", keys=[2]) == {2: {"x": (-6.0, "live"), "y": (0.0, "live")}}
+    assert read_envelope(connection, "u", kind="max", keys=[1]) == {1: {"x": (1.0, "dead"), "y": (1.0, "live")}}
+    absmax = read_envelope(connection, "u")
+    assert absmax[2]["x"] == (-6.0, "live")
+    assert absmax[3] == {"x": (-1.0, "dead"), "y": (4.0, "dead")}
+
+    with pytest.raises(ValueError):
+        read_envelope(connection, "u", kind="mean")
+
+
+def test_shell_stresses_mixed_elements():
+    # a triangle with 3 integration points and a quadrilateral with 4
+    rng = np.random.default_rng(0)
+    triangle = rng.normal(size=(3, 8))
+    quad = rng.normal(size=(4, 8))
+    values = np.full((2, 32), np.nan)
+    values[0, :24] = triangle.ravel()
+    values[1] = quad.ravel()
+    counts = np.array([24, 32])
+    thicknesses = np.array([0.2, 0.5])
+
+    stresses = shell_stresses(values, counts, thicknesses)
+    for averages, t, row in zip([triangle.mean(axis=0), quad.mean(axis=0)], thicknesses, stresses):
+        factors = [1 / t] * 3 + [6 / t**2] * 3 + [6 / (5 * t)] * 2
+        assert row == pytest.approx(averages * factors)
+
+
+@pytest.mark.parametrize("newline", [False, True])
+def test_read_binary_results(tmp_path, newline):
+    keys = [3, 1, 7]
+    (tmp_path / "u.tags").write_text(" ".join(str(key) for key in keys) + "\n")
+    records = [np.arange(6, dtype="<f8").reshape(3, 2) + 10 * i for i in range(4)]
+    with open(tmp_path / "u.bin", "wb") as f:
+        for record in records:
+            f.write(record.tobytes() + (b"\n" if newline else b""))
+    tags, values = read_binary_results(str(tmp_path), "u", 2)
+    np.testing.assert_array_equal(tags, keys)
+    # only the last record is returned
+    np.testing.assert_array_equal(values, records[-1])
+
+
+def test_read_binary_results_without_members(tmp_path):
+    (tmp_path / "u.tags").write_text("\n")
+    tags, values = read_binary_results(str(tmp_path), "u", 3)
+    assert len(tags) == 0
+    assert values.shape == (0, 3)
+
+
+def test_tcl_tags_of_a_group_in_a_subdomain(grid_model):
+    part = grid_model(4, 3).parts[0]
+    group = SimpleNamespace(nodes=part.nodes[:6], elements=part.elements[:3])
+    assert tcl_tags("node") == "[getNodeTags]"
+    assert tcl_tags("element", group) == "{1 2 3}"
+    # a rank only writes the results of the members of the group it defines
+    subdomain = Subdomain(1, set(part.nodes[4:12]), set(part.elements[1:2]), set(), set())
+    assert tcl_tags("node", group, subdomain) == "{5 6}"
+    assert tcl_tags("element", group, subdomain) == "{2}"
+    assert tcl_tags("element", SimpleNamespace(elements=part.elements[2:3]), subdomain) == "{}"
@@ -0,0 +1,22 @@
+from types import SimpleNamespace
+
+from compas_fea2_opensees.problem import OpenseesStaticStep
+
+
+def _step(**kwargs):
+    step = OpenseesStaticStep(name="push", max_increments=50, initial_inc_size=0.5, min_inc_size=0.01, time=2.0, **kwargs)
+    step._registration = SimpleNamespace(_steps_order=[None, step])
+    return step
+
+
+def test_step_applies_constant_loads():
+    assert "timeSeries Constant 1 -factor 1.0" in _step()._generate_header_section()
+
+
+def test_adaptive_step_ramps_the_loads():
+    step = _step(adaptive=True)
+    # the full load is reached at the time of the step
+    header = step._generate_header_section()
+    assert "timeSeries Linear 1 -factor 0.5" in header
+    assert "timeSeries Constant" not in header
+    assert "integrator LoadControl $size" in step._generate_increments_section()
@@ -0,0 +1,24 @@
+import numpy as np
+
+from compas_fea2_opensees.utilities import read_table
+
+
+def test_read_table(tmp_path):
+    path = tmp_path / "u.out"
+    path.write_text("1 0.5 -2.0\n2 1e-3 4.0\n")
+    np.testing.assert_array_equal(read_table(str(path)), [[1.0, 0.5, -2.0], [2.0, 1e-3, 4.0]])
+
+
+def test_read_table_ragged(tmp_path):
+    path = tmp_path / "s.out"
+    path.write_text("1 0.5 -2.0\n2 1.0\n\n3 1.0 2.0 3.0\n")
+    table = read_table(str(path))
+    np.testing.assert_array_equal(table, [[1.0, 0.5, -2.0, np.nan], [2.0, 1.0, np.nan, np.nan], [3.0, 1.0, 2.0, 3.0]])
+
+
+def test_read_table_empty(tmp_path):
+    path = tmp_path / "empty.out"
+    path.write_text("")
+    table = read_table(str(path))
+    assert table.ndim == 2
+    assert table.shape[0] == 0